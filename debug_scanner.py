@@ -2,11 +2,33 @@
 """
 Debug scanner to investigate high image count.
 """
+import os
 import sys
+import time
 from pathlib import Path
 from collections import Counter
 from image_scanner import ImageScanner
 
+def _scandir_recursive(path: str):
+    """
+    Recursively yield os.DirEntry objects for regular files under path.
+    
+    DirEntry caches its type from the directory listing, so no extra stat()
+    call is needed per file. Symlinks are skipped and unreadable
+    directories are ignored.
+    """
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _scandir_recursive(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+    except OSError:
+        return
+
 def debug_scan(directory_path: str, max_depth: int = 3, sample_size: int = 20):
     """
     Debug scan that shows what files are being detected and where.
@@ -17,6 +39,7 @@ def debug_scan(directory_path: str, max_depth: int = 3, sample_size: int = 20):
         return
     
     scanner = ImageScanner()
+    supported = frozenset(ext.lower() for ext in scanner.supported_extensions)
     
     # Count files by extension
     extension_counts = Counter()
@@ -30,29 +53,29 @@ def debug_scan(directory_path: str, max_depth: int = 3, sample_size: int = 20):
     # Manual scan to debug
     total_files_checked = 0
     image_files_found = 0
+    last_print = time.monotonic()
     
-    for file_path in directory.rglob('*'):
-        if file_path.is_file():
-            total_files_checked += 1
-            extension = file_path.suffix.lower()
+    for entry in _scandir_recursive(directory_path):
+        total_files_checked += 1
+        extension = os.path.splitext(entry.name)[1].lower()
+        
+        if extension in supported:
+            image_files_found += 1
+            extension_counts[extension] += 1
+            
+            # Track which directories have the most images
+            top_dir = os.path.relpath(entry.path, directory_path).split(os.sep, 1)[0]
+            directory_counts[top_dir] += 1
             
-            if scanner._is_image_file(file_path):
-                image_files_found += 1
-                extension_counts[extension] += 1
-                
-                # Track which directories have the most images
-                relative_path = file_path.relative_to(directory)
-                if len(relative_path.parts) > 0:
-                    top_dir = relative_path.parts[0]
-                    directory_counts[top_dir] += 1
-                
-                # Keep sample files
-                if len(sample_files) < sample_size:
-                    sample_files.append(file_path)
+            # Keep sample files
+            if len(sample_files) < sample_size:
+                sample_files.append(Path(entry.path))
         
-        # Show progress every 10,000 files
-        if total_files_checked % 10000 == 0:
+        # Show progress at most once per second
+        now = time.monotonic()
+        if now - last_print > 1.0:
             print(f"Checked {total_files_checked} files, found {image_files_found} images so far...")
+            last_print = now
     
     # Results
     print(f"\nScan Results:")
@@ -5,6 +5,8 @@ Image Deduplication Tool
 Scans directories for duplicate images using perceptual hashing and organizes
 unique images into a target directory, keeping the highest quality versions.
 """
+import os
+import sqlite3
 import sys
 from pathlib import Path
 import click
@@ -25,7 +27,8 @@ from typing import List, Optional
 @click.option('--dry-run', '-n', is_flag=True,
               help='Show what would be done without actually copying files')
 @click.option('--report', '-r', type=click.Path(),
-              help='Save detailed report to specified file')
+              help='Save detailed report to specified file. Per-file results are streamed '
+                   'to <name>.results.ndjson beside it, and the report keeps only the last 100')
 @click.option('--quiet', '-q', is_flag=True,
               help='Suppress progress bars and verbose output')
 @click.option('--hash-size', default=8, type=int,
@@ -34,11 +37,27 @@ from typing import List, Optional
               help='Process only the first N images (for testing/debugging)')
 @click.option('--verbose-errors', is_flag=True,
               help='Show all errors in console output (not just first 10)')
+@click.option('--workers', '-w', type=int,
+              help='Number of processes for hash generation (and threads for scanning). Default: CPU count')
+@click.option('--threads', is_flag=True,
+              help='Hash with threads instead of processes (faster on slow or network storage)')
+@click.option('--copy-workers', type=int,
+              help='Number of threads copying unique images. Default: 4 per CPU, at most 32')
+@click.option('--link-mode', type=click.Choice(['copy', 'hardlink']), default='copy',
+              help='Copy unique images, or hard link them when on the same filesystem. Default: copy')
+@click.option('--incremental', is_flag=True,
+              help='Skip images an earlier run already copied to OUTPUT_DIRECTORY')
+@click.option('--cache-file', type=click.Path(dir_okay=False),
+              help='Hash cache database. Default: ~/.dedupe_cache.db')
+@click.option('--no-cache', is_flag=True,
+              help='Rehash every image instead of reusing cached hashes')
 @click.help_option("-h", "--help")
 def main(input_directory: str, output_directory: str, threshold: int, agreement: int,
          extensions: tuple, preserve_structure: bool, dry_run: bool, 
          report: Optional[str], quiet: bool, hash_size: int, 
-         sample: Optional[int], verbose_errors: bool):
+         sample: Optional[int], verbose_errors: bool, workers: Optional[int], threads: bool,
+         copy_workers: Optional[int], link_mode: str, incremental: bool, cache_file: Optional[str],
+         no_cache: bool):
     """
     Image Deduplication Tool
     
@@ -69,7 +88,8 @@ def main(input_directory: str, output_directory: str, threshold: int, agreement:
         from hash_generator import HashGenerator
         from duplicate_detector import DuplicateDetector
         from quality_assessor import QualityAssessor
-        from file_organizer import FileOrganizer
+        from file_organizer import FileOrganizer, _fast_exact_dedupe
+        from hash_cache import HashCache
     except ImportError as e:
         click.echo(f"Error: Missing dependencies. Please run: pip install -r requirements.txt", err=True)
         click.echo(f"Import error: {e}", err=True)
@@ -89,6 +109,27 @@ def main(input_directory: str, output_directory: str, threshold: int, agreement:
             click.echo("Error: Hash size must be 8 or 16", err=True)
             sys.exit(1)
         
+        if workers is None:
+            workers = os.cpu_count() or 1
+        elif workers < 1:
+            click.echo("Error: Workers must be at least 1", err=True)
+            sys.exit(1)
+        
+        if copy_workers is not None and copy_workers < 1:
+            click.echo("Error: Copy workers must be at least 1", err=True)
+            sys.exit(1)
+        
+        # Per-file results are streamed next to the report instead of being
+        # held in memory
+        results_path = None
+        if report and not dry_run:
+            report_path = Path(report)
+            results_path = report_path.with_name(report_path.stem + '.results.ndjson')
+            if results_path.resolve() == report_path.resolve():
+                click.echo(f"Error: Report {report} and its results stream {results_path} "
+                           f"are the same file", err=True)
+                sys.exit(1)
+        
         # Initialize components
         scanner = ImageScanner()
         hash_generator = HashGenerator(hash_size=hash_size)
@@ -99,7 +140,10 @@ def main(input_directory: str, output_directory: str, threshold: int, agreement:
         file_organizer = FileOrganizer(
             output_directory=output_directory,
             preserve_structure=preserve_structure,
-            dry_run=dry_run
+            dry_run=dry_run,
+            copy_workers=copy_workers,
+            incremental=incremental,
+            link_mode=link_mode
         )
         
         # Add any additional extensions
@@ -114,7 +158,8 @@ def main(input_directory: str, output_directory: str, threshold: int, agreement:
             click.echo("Scanning for images...")
         
         try:
-            image_paths = scanner.scan_directory(input_directory, show_progress=not quiet)
+            image_paths = scanner.scan_directory(input_directory, show_progress=not quiet,
+                                                  workers=workers)
         except Exception as e:
             click.echo(f"Error scanning directory: {e}", err=True)
             sys.exit(1)
@@ -132,15 +177,57 @@ def main(input_directory: str, output_directory: str, threshold: int, agreement:
                 click.echo(f"SAMPLE MODE: Processing first {sample} of {len(image_paths)} images")
             image_paths = image_paths[:sample]
         
+        # Byte-identical copies don't need perceptual hashing
+        unique_paths, exact_duplicates = _fast_exact_dedupe(image_paths)
+        if exact_duplicates and not quiet:
+            click.echo(f"Skipping {len(image_paths) - len(unique_paths)} byte-identical copies")
+        
         # Step 2: Generate perceptual hashes
         if not quiet:
             click.echo("Generating perceptual hashes...")
         
+        hash_cache = None
+        if not no_cache:
+            try:
+                hash_cache = HashCache(cache_file)
+            except Exception as e:
+                click.echo(f"Warning: Hash cache unavailable: {e}", err=True)
+        
         try:
-            hash_results = hash_generator.generate_hashes(image_paths, show_progress=not quiet)
+            cached_results = {}
+            if hash_cache:
+                try:
+                    cached_results = hash_cache.get_many(unique_paths, hash_size)
+                except sqlite3.Error as e:
+                    # Hash everything rather than lose the run to the cache
+                    click.echo(f"Warning: Hash cache lookup failed: {e}", err=True)
+            
+            paths_to_hash = [p for p in unique_paths if p not in cached_results]
+            
+            if cached_results and not quiet:
+                click.echo(f"Reusing cached hashes for {len(cached_results)} images")
+            
+            new_results = hash_generator.generate_hashes(
+                paths_to_hash, show_progress=not quiet, workers=workers,
+                use_threads=threads
+            ) if paths_to_hash else []
+            
+            if hash_cache:
+                try:
+                    hash_cache.put_many(new_results, hash_size)
+                except sqlite3.Error as e:
+                    click.echo(f"Warning: Failed to update hash cache: {e}", err=True)
+            
+            # Merge cached and fresh results back into scan order
+            new_iter = iter(new_results)
+            hash_results = [cached_results[p] if p in cached_results else next(new_iter)
+                            for p in unique_paths]
         except Exception as e:
             click.echo(f"Error generating hashes: {e}", err=True)
             sys.exit(1)
+        finally:
+            if hash_cache:
+                hash_cache.close()
         
         # Report any images that failed to process
         failed_images = [r for r in hash_results if r.error]
@@ -187,6 +274,9 @@ def main(input_directory: str, output_directory: str, threshold: int, agreement:
         
         try:
             duplicate_groups = duplicate_detector.find_duplicates(hash_results, show_progress=not quiet)
+            duplicate_groups = duplicate_detector.merge_exact_duplicates(
+                duplicate_groups, hash_results, exact_duplicates
+            )
         except Exception as e:
             click.echo(f"Error detecting duplicates: {e}", err=True)
             sys.exit(1)
@@ -209,7 +299,9 @@ def main(input_directory: str, output_directory: str, threshold: int, agreement:
             organization_report = file_organizer.organize_images(
                 duplicate_groups=duplicate_groups,
                 all_images=image_paths,
-                show_progress=not quiet
+                show_progress=not quiet,
+                results_path=results_path,
+                hash_results=hash_results
             )
         except Exception as e:
             click.echo(f"Error organizing files: {e}", err=True)
@@ -285,20 +377,26 @@ def analyze(directory: str, threshold: int, agreement: int):
             require_agreement=agreement
         )
         
-        # Scan and analyze
-        click.echo("🔍 Scanning for images...")
-        image_paths = scanner.scan_directory(directory)
+        # Scan, hash and group in one streaming pass
+        click.echo("🔍 Scanning and analyzing images...")
+        image_count = 0
         
-        if not image_paths:
-            click.echo("No images found.")
-            return
+        def counted(paths):
+            nonlocal image_count
+            for path in paths:
+                image_count += 1
+                yield path
         
-        click.echo(f"📊 Generating hashes for {len(image_paths)} images...")
-        hash_results = hash_generator.generate_hashes(image_paths)
+        hash_results = hash_generator.iter_generate_hashes(
+            counted(scanner.iter_scan_directory(directory))
+        )
+        duplicate_groups = duplicate_detector.find_duplicates_streaming(hash_results)
         
-        click.echo("🔍 Analyzing for duplicates...")
-        duplicate_groups = duplicate_detector.find_duplicates(hash_results)
+        if not image_count:
+            click.echo("No images found.")
+            return
         
+        click.echo(f"📊 Analyzed {image_count} images")
         duplicate_detector.print_duplicate_report(duplicate_groups)
         
     except Exception as e:
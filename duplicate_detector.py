@@ -1,12 +1,77 @@
 """
 Duplicate detection module for finding similar images using perceptual hashes.
 """
-from typing import List, Dict, Set, Tuple
-from dataclasses import dataclass
-from hash_generator import ImageHashResult, HashGenerator
+from typing import List, Dict, Set, Tuple, Optional, Iterable, Sequence, Union
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from pathlib import Path
+import numpy as np
+from hash_generator import (
+    ImageHashResult, ImageHashTable, HashGenerator, HASH_ALGORITHMS, hamming_distances, bit_count
+)
 from tqdm import tqdm
 
 
+# Format priority for picking a group's representative (higher = better)
+FORMAT_PRIORITY = {
+    'PSD': 100,
+    'PNG': 90,
+    'TIFF': 80,
+    'TIF': 80,
+    'BMP': 70,
+    'WEBP': 60,
+    'JPG': 50,
+    'JPEG': 50,
+    'GIF': 40
+}
+DEFAULT_FORMAT_PRIORITY = 30
+
+
+def consensus_pairs(packed: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]],
+                    pairs_i: np.ndarray, pairs_j: np.ndarray,
+                    threshold: int, require_agreement: int) -> np.ndarray:
+    """
+    Check many image pairs for consensus similarity at once.
+    
+    Args:
+        packed: Mapping of algorithm to (words, lengths) as built by
+            DuplicateDetector._pack_hashes
+        pairs_i: Array of first image indices
+        pairs_j: Array of second image indices, same length as pairs_i
+        threshold: Maximum Hamming distance for similarity
+        require_agreement: Number of algorithms that must agree
+        
+    Returns:
+        Boolean mask over the pairs, True where enough algorithms agree
+    """
+    agreements = np.zeros(len(pairs_i), dtype=np.intp)
+    algorithms = list(packed.values())
+    
+    for step, (words, lengths) in enumerate(algorithms):
+        pi, pj = pairs_i, pairs_j
+        undecided = None
+        
+        if step == len(algorithms) - 1 and step > 0:
+            # Only pairs exactly one agreement short need the last algorithm
+            undecided = np.flatnonzero(agreements == require_agreement - 1)
+            if not len(undecided):
+                break
+            pi, pj = pairs_i[undecided], pairs_j[undecided]
+        
+        distances = hamming_distances(words[pi], words[pj])
+        similar = distances <= threshold
+        if lengths is not None:
+            # Empty or mismatched hashes never count as similar
+            similar &= (lengths[pi] == lengths[pj]) & (lengths[pi] > 0)
+        
+        if undecided is None:
+            agreements += similar
+        else:
+            agreements[undecided] += similar
+    
+    return agreements >= require_agreement
+
+
 @dataclass
 class DuplicateGroup:
     """A group of duplicate/similar images."""
@@ -24,6 +89,10 @@ class DuplicateGroup:
 class DuplicateDetector:
     """Detects duplicate images using perceptual hash comparison."""
     
+    # Hash attributes compared for consensus, in comparison order (matches
+    # ImageHashResult.hash_values)
+    HASH_ALGORITHMS = HASH_ALGORITHMS
+    
     def __init__(self, similarity_threshold: int = 10, require_agreement: int = 2):
         """
         Initialize duplicate detector.
@@ -35,63 +104,182 @@ class DuplicateDetector:
         self.similarity_threshold = similarity_threshold
         self.require_agreement = require_agreement
         self.hash_generator = HashGenerator()
+        
+        # Pigeonhole principle: two hashes within `similarity_threshold` bits
+        # of each other match exactly on at least one of this many chunks
+        self.n_chunks = max(1, similarity_threshold + 1)
+        
+        self.reset()
+    
+    def reset(self) -> None:
+        """Discard all images collected with add()."""
+        self._groups: List[List[ImageHashResult]] = []  # Leader first
+        self._leader_buckets: Dict[tuple, List[int]] = defaultdict(list)
+        self._wildcard_leaders: List[int] = []
+    
+    def add(self, result: ImageHashResult) -> None:
+        """
+        Add one hash result to the incremental duplicate index.
+        
+        Each image joins the group of the earliest group leader it is
+        similar to, or starts a new group. This produces exactly the groups
+        find_duplicates would for the same images in the same order, while
+        only ever comparing against leaders that share a bucket.
+        
+        Args:
+            result: Image hash result (failed results are ignored)
+        """
+        if result.error:
+            return
+        
+        keys = self._chunk_keys([getattr(result, algorithm) for algorithm in self.HASH_ALGORITHMS])
+        if keys is None:
+            candidates = range(len(self._groups))
+        else:
+            candidates = set(self._wildcard_leaders)
+            for key in keys:
+                candidates.update(self._leader_buckets.get(key, ()))
+            candidates = sorted(candidates)
+        
+        for leader in candidates:
+            if self._are_images_similar(self._groups[leader][0], result):
+                self._groups[leader].append(result)
+                return
+        
+        # No match, so this image leads a new group
+        leader = len(self._groups)
+        self._groups.append([result])
+        if keys is None:
+            self._wildcard_leaders.append(leader)
+        else:
+            for key in keys:
+                self._leader_buckets[key].append(leader)
+    
+    def get_groups(self) -> List[DuplicateGroup]:
+        """
+        Get the duplicate groups collected so far with add().
+        
+        Returns:
+            List of DuplicateGroup objects, largest first
+        """
+        duplicate_groups = [
+            DuplicateGroup(images=list(images), representative=self._select_best_image(images))
+            for images in self._groups if len(images) > 1
+        ]
+        duplicate_groups.sort(key=len, reverse=True)
+        return duplicate_groups
     
-    def find_duplicates(self, hash_results: List[ImageHashResult], 
+    def find_duplicates_streaming(self, hash_results: Iterable[ImageHashResult],
+                                  show_progress: bool = True) -> List[DuplicateGroup]:
+        """
+        Find duplicate groups while consuming hash results one at a time.
+        
+        Suitable for feeding from HashGenerator.iter_generate_hashes, so
+        hashing and grouping overlap and no result list is built up front.
+        
+        Args:
+            hash_results: Iterable of image hash results
+            show_progress: Whether to show progress bar
+            
+        Returns:
+            List of DuplicateGroup objects, each containing similar images
+        """
+        self.reset()
+        
+        if show_progress:
+            hash_results = tqdm(hash_results, desc="Finding duplicates", unit="images")
+        
+        for result in hash_results:
+            self.add(result)
+        
+        return self.get_groups()
+    
+    def find_duplicates(self, hash_results: Union[List[ImageHashResult], ImageHashTable], 
                        show_progress: bool = True) -> List[DuplicateGroup]:
         """
         Find duplicate groups among image hash results.
         
         Args:
-            hash_results: List of image hash results
+            hash_results: List or table of image hash results
             show_progress: Whether to show progress bar
             
         Returns:
             List of DuplicateGroup objects, each containing similar images
         """
         # Filter out failed hash results
-        valid_results = [r for r in hash_results if not r.error]
+        if isinstance(hash_results, ImageHashTable):
+            valid_results = hash_results.take(
+                i for i, error in enumerate(hash_results.errors) if not error
+            )
+        else:
+            valid_results = [r for r in hash_results if not r.error]
         
         if len(valid_results) < 2:
             return []
         
+        # The search itself only reads the table's columns
+        table = valid_results
+        if not isinstance(table, ImageHashTable):
+            table = ImageHashTable.from_results(valid_results)
+        format_scores = self._format_scores(table)
+        
+        # Bucket hashes by chunk so each image is only compared with the
+        # images it could possibly match
+        buckets, bucket_keys, wildcards = self._build_candidate_index(table)
+        packed = self._pack_hashes(table)
+        if packed is not None:
+            packed, rows = self._sort_for_locality(packed)
+        
         # Track which images have been assigned to groups
-        assigned = set()
+        assigned = np.zeros(len(valid_results), dtype=np.bool_)
         duplicate_groups = []
         
-        # Progress bar setup
-        total_comparisons = len(valid_results) * (len(valid_results) - 1) // 2
+        # Progress counts images as they are grouped, not comparisons
         if show_progress:
-            pbar = tqdm(total=total_comparisons, desc="Finding duplicates", unit="comparisons")
+            pbar = tqdm(total=len(valid_results), desc="Finding duplicates", unit="images")
         
-        # Compare each image with every other image
-        for i, result1 in enumerate(valid_results):
-            if id(result1) in assigned:
+        # Compare each image with its remaining candidates
+        for i in range(len(table)):
+            if assigned[i]:
                 continue
             
+            assigned[i] = True
+            
+            # Visit unassigned candidates in input order so grouping matches
+            # a full scan
+            if bucket_keys[i] is None:
+                candidates = np.flatnonzero(~assigned[i + 1:]) + i + 1
+            else:
+                candidates = np.concatenate(
+                    [buckets[key] for key in bucket_keys[i]] + [wildcards]
+                )
+                candidates = candidates[candidates > i]
+                candidates = np.sort(candidates[~assigned[candidates]])
+                # Drop indices found through more than one bucket
+                if len(candidates) > 1:
+                    candidates = candidates[np.append(True, candidates[1:] != candidates[:-1])]
+            if packed is not None:
+                matches = candidates[self._consensus_batch(packed, rows[i], rows[candidates])]
+            else:
+                matches = np.array([j for j in candidates
+                                    if self._are_images_similar(valid_results[i], valid_results[j])],
+                                   dtype=np.intp)
+            assigned[matches] = True
+            
             # Start a new group with this image
-            current_group = [result1]
-            assigned.add(id(result1))
+            current_group = np.append(i, matches)
             
-            # Compare with all remaining images
-            for j, result2 in enumerate(valid_results[i+1:], i+1):
-                if show_progress:
-                    pbar.update(1)
-                
-                if id(result2) in assigned:
-                    continue
-                
-                # Check if images are similar
-                if self._are_images_similar(result1, result2):
-                    current_group.append(result2)
-                    assigned.add(id(result2))
+            if show_progress:
+                pbar.update(len(current_group))
             
             # Only keep groups with multiple images (actual duplicates)
             if len(current_group) > 1:
                 # Find the best representative image in the group
-                representative = self._select_best_image(current_group)
+                images = [valid_results[j] for j in current_group]
+                best = self._best_index(table, format_scores, current_group)
                 duplicate_groups.append(DuplicateGroup(
-                    images=current_group,
-                    representative=representative
+                    images=images,
+                    representative=images[best]
                 ))
         
         if show_progress:
@@ -102,14 +290,214 @@ class DuplicateDetector:
         
         return duplicate_groups
     
-    def _are_images_similar(self, result1: ImageHashResult, result2: ImageHashResult) -> bool:
-        """Check if two image results represent similar images."""
-        return self.hash_generator.get_consensus_similarity(
-            result1, result2, 
-            threshold=self.similarity_threshold,
-            require_agreement=self.require_agreement
+    def merge_exact_duplicates(self, duplicate_groups: List[DuplicateGroup],
+                               hash_results: List[ImageHashResult],
+                               exact_duplicates: Dict[Path, List[Path]]) -> List[DuplicateGroup]:
+        """
+        Fold byte-identical copies back into the duplicate groups.
+        
+        Copies skipped before hashing get their source's hash result, so
+        they join the source's group, or form a new group with it.
+        
+        Args:
+            duplicate_groups: Groups found among the hashed images
+            hash_results: Hash results for the hashed images
+            exact_duplicates: Mapping of hashed path to its identical copies
+            
+        Returns:
+            List of DuplicateGroup objects, largest first
+        """
+        if not exact_duplicates:
+            return duplicate_groups
+        
+        group_of = {img.file_path: group for group in duplicate_groups for img in group.images}
+        merged_groups = list(duplicate_groups)
+        
+        for result in hash_results:
+            copies = exact_duplicates.get(result.file_path)
+            if not copies or result.error:
+                continue
+            
+            clones = [replace(result, file_path=path) for path in copies]
+            group = group_of.get(result.file_path)
+            if group is not None:
+                # Clones tie with their source, so the representative stands
+                group.images.extend(clones)
+            else:
+                merged_groups.append(DuplicateGroup(images=[result] + clones, representative=result))
+        
+        merged_groups.sort(key=len, reverse=True)
+        return merged_groups
+    
+    def _chunk_keys(self, hashes: Sequence[str]) -> Optional[List[tuple]]:
+        """
+        Get the multi-index bucket keys for one image's hashes.
+        
+        Each hash is split into `n_chunks` disjoint bit ranges, giving one
+        (algorithm, length, chunk, value) key per range. Only enough
+        algorithms are indexed to guarantee that any pair agreeing on
+        `require_agreement` algorithms shares at least one key.
+        
+        Args:
+            hashes: Hash strings, in HASH_ALGORITHMS order
+            
+        Returns:
+            List of bucket keys, or None if the image can't be bucketed and
+            must be compared with every other image
+        """
+        indexed_count = len(self.HASH_ALGORITHMS) - self.require_agreement + 1
+        if indexed_count > len(self.HASH_ALGORITHMS):
+            return None  # Every pair is trivially similar
+        
+        keys = []
+        for algorithm, hash_str in zip(self.HASH_ALGORITHMS[:max(0, indexed_count)], hashes):
+            if not hash_str:
+                continue  # Empty hashes never count as similar
+            
+            bits = len(hash_str) * 4
+            if self.n_chunks > bits:
+                return None
+            
+            try:
+                value = int(hash_str, 16)
+            except ValueError:
+                return None
+            
+            for chunk in range(self.n_chunks):
+                start = chunk * bits // self.n_chunks
+                end = (chunk + 1) * bits // self.n_chunks
+                chunk_value = (value >> start) & ((1 << (end - start)) - 1)
+                keys.append((algorithm, len(hash_str), chunk, chunk_value))
+        
+        return keys
+    
+    def _build_candidate_index(self, table: ImageHashTable) -> Tuple[
+            Dict[tuple, np.ndarray], List[Optional[List[tuple]]], np.ndarray]:
+        """
+        Build a multi-index of hash chunks for candidate lookup.
+        
+        Args:
+            table: Table of valid image hash results
+            
+        Returns:
+            Tuple of (buckets, bucket_keys, wildcards), with index arrays as
+            values. bucket_keys[i] is None when image i must be compared with
+            every other image, and wildcards lists those images.
+        """
+        buckets = defaultdict(list)
+        bucket_keys = []
+        wildcards = []
+        
+        columns = [getattr(table, algorithm) for algorithm in self.HASH_ALGORITHMS]
+        for index, hashes in enumerate(zip(*columns)):
+            keys = self._chunk_keys(hashes)
+            bucket_keys.append(keys)
+            
+            if keys is None:
+                wildcards.append(index)
+                continue
+            
+            for key in keys:
+                buckets[key].append(index)
+        
+        buckets = {key: np.array(members, dtype=np.intp) for key, members in buckets.items()}
+        return buckets, bucket_keys, np.array(wildcards, dtype=np.intp)
+    
+    def _pack_hashes(self, results: Union[List[ImageHashResult], ImageHashTable]
+                     ) -> Optional[Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]]:
+        """
+        Pack every hash into a uint64 matrix for vectorized comparison.
+        
+        Args:
+            results: List or table of valid image hash results
+            
+        Returns:
+            Packed hashes as returned by HashGenerator.pack_hashes, or None
+            if any hash is not a hex string
+        """
+        try:
+            return self.hash_generator.pack_hashes(results, self.HASH_ALGORITHMS)
+        except ValueError:
+            return None
+    
+    def _sort_for_locality(self, packed: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]
+                           ) -> Tuple[Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]], np.ndarray]:
+        """
+        Reorder packed hash rows by their leading pHash bits.
+        
+        Likely duplicates share a pHash prefix, so sorting by it makes the
+        rows gathered for each candidate batch sit close together in memory.
+        Results keep their original order; only the packed rows move.
+        
+        Args:
+            packed: Packed hashes from _pack_hashes
+            
+        Returns:
+            Tuple of (sorted packed hashes, rows), where rows[i] is the
+            packed row of result i
+        """
+        words = packed['phash'][0]
+        prefix = (words if words.ndim == 1 else words[:, 0]) >> np.uint64(48)
+        order = np.argsort(prefix, kind='stable')
+        
+        rows = np.empty_like(order)
+        rows[order] = np.arange(len(order))
+        
+        sorted_packed = {
+            algorithm: (words[order], None if lengths is None else lengths[order])
+            for algorithm, (words, lengths) in packed.items()
+        }
+        return sorted_packed, rows
+    
+    def _consensus_batch(self, packed: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]],
+                         index: int, candidates: np.ndarray) -> np.ndarray:
+        """
+        Check one image against many candidates at once.
+        
+        Args:
+            packed: Packed hashes from _pack_hashes
+            index: Packed row of the image to compare
+            candidates: Array of candidate packed rows
+            
+        Returns:
+            Boolean mask over candidates, True where enough algorithms agree
+        """
+        return consensus_pairs(
+            packed, np.full(len(candidates), index, dtype=np.intp), candidates,
+            self.similarity_threshold, self.require_agreement
         )
     
+    def _are_images_similar(self, result1: ImageHashResult, result2: ImageHashResult) -> bool:
+        """
+        Check if two image results represent similar images.
+        
+        Algorithms are compared one at a time, stopping as soon as the
+        outcome is settled either way.
+        """
+        if result1.error or result2.error:
+            return False
+        
+        agreements = 0
+        remaining = len(self.HASH_ALGORITHMS)
+        threshold = self.similarity_threshold
+        
+        for algorithm, entry1, entry2 in zip(self.HASH_ALGORITHMS, result1.hash_values(),
+                                             result2.hash_values()):
+            if agreements >= self.require_agreement:
+                return True
+            if agreements + remaining < self.require_agreement:
+                return False
+            
+            if entry1 is not None and entry2 is not None and entry1[0] == entry2[0]:
+                similar = bit_count(entry1[1] ^ entry2[1]) <= threshold
+            else:
+                similar = self.hash_generator.are_similar(getattr(result1, algorithm),
+                                                          getattr(result2, algorithm), threshold)
+            agreements += similar
+            remaining -= 1
+        
+        return agreements >= self.require_agreement
+    
     def _select_best_image(self, images: List[ImageHashResult]) -> ImageHashResult:
         """
         Select the best quality image from a group of similar images.
@@ -128,29 +516,36 @@ class DuplicateDetector:
         if len(images) == 1:
             return images[0]
         
-        # Define format priority (higher number = better)
-        format_priority = {
-            'PSD': 100,
-            'PNG': 90,
-            'TIFF': 80,
-            'TIF': 80,
-            'BMP': 70,
-            'WEBP': 60,
-            'JPG': 50,
-            'JPEG': 50,
-            'GIF': 40
-        }
+        table = ImageHashTable.from_results(images)
+        return images[self._best_index(table, self._format_scores(table), np.arange(len(images)))]
+    
+    def _format_scores(self, table: ImageHashTable) -> np.ndarray:
+        """Get the FORMAT_PRIORITY score of every row in a table."""
+        return np.array(
+            [FORMAT_PRIORITY.get(fmt.upper(), DEFAULT_FORMAT_PRIORITY) for fmt in table.formats],
+            dtype=np.int8
+        )
+    
+    def _best_index(self, table: ImageHashTable, format_scores: np.ndarray,
+                    indices: np.ndarray) -> int:
+        """
+        Pick the best quality row among the given table rows.
         
-        def score_image(img: ImageHashResult) -> tuple:
-            """Score an image for quality comparison."""
-            format_score = format_priority.get(img.format.upper(), 30)
-            resolution_score = img.image_width * img.image_height
-            size_score = img.file_size
-            
-            return (format_score, resolution_score, size_score)
+        Rows are ranked by format, then resolution, then file size; ties go
+        to the earliest of `indices`.
         
-        # Return the image with the highest score
-        return max(images, key=score_image)
+        Args:
+            table: Table of image hash results
+            format_scores: Format score of every row, from _format_scores
+            indices: Array of row indices
+            
+        Returns:
+            Position within indices of the best image
+        """
+        area = table.widths[indices].astype(np.int64) * table.heights[indices]
+        order = np.lexsort((-np.arange(len(indices)), table.file_sizes[indices],
+                            area, format_scores[indices]))
+        return int(order[-1])
     
     def get_statistics(self, duplicate_groups: List[DuplicateGroup]) -> Dict[str, any]:
         """
@@ -173,9 +568,10 @@ class DuplicateDetector:
         
         total_groups = len(duplicate_groups)
         total_duplicates = sum(len(group) for group in duplicate_groups)
-        total_size_saved = sum(
-            group.total_size() - group.representative.file_size 
-            for group in duplicate_groups
+        # Two flat sums instead of a generator of per-group sums
+        total_size_saved = (
+            sum([img.file_size for group in duplicate_groups for img in group.images])
+            - sum([group.representative.file_size for group in duplicate_groups])
         )
         largest_group_size = max(len(group) for group in duplicate_groups)
         average_group_size = total_duplicates / total_groups if total_groups > 0 else 0
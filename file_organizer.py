@@ -2,16 +2,285 @@
 File organization module for copying unique images to output directory.
 """
 from pathlib import Path
-from typing import List, Dict, Optional, Set
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Set, Tuple
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
 import shutil
+import sys
 from dataclasses import dataclass
 from tqdm import tqdm
 import json
 from datetime import datetime
 from duplicate_detector import DuplicateGroup
+from hash_generator import ImageHashResult
 
+try:
+    import fcntl  # Unix only, used for reflink copies
+except ImportError:
+    fcntl = None
 
-@dataclass
+try:
+    import blake3  # Optional: SIMD, multithreaded hashing for exact dedupe
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson  # Optional: faster JSON encoding for reports
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash  # Optional: faster digests for the exact dedupe prefilter
+except ImportError:
+    xxhash = None
+
+
+# Bytes read from each end of a file when prefiltering exact duplicates
+EXACT_DEDUPE_SAMPLE_BYTES = 64 * 1024
+
+# Files at least this large are hashed with blake3's multithreaded mmap path
+BLAKE3_MMAP_MIN_BYTES = 1024 * 1024
+
+# Linux ioctl that shares one file's extents with another (btrfs, XFS)
+FICLONE = 0x40049409
+
+# Dataclass options for records kept once per file (slots need Python >= 3.10)
+PER_FILE_DATACLASS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def _in_order(items: Iterator, order: List[int]) -> Iterator:
+    """
+    Yield items produced in a permuted order back in their original order.
+    
+    Args:
+        items: Items where the nth one belongs at position order[n]
+        order: Permutation of range(len(order))
+    
+    Items are held only until every earlier position has arrived, so
+    memory stays bounded when the permutation only moves items locally.
+    """
+    pending = {}
+    next_index = 0
+    for index, item in zip(order, items):
+        pending[index] = item
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+
+
+def _rewind(src_fd: int, dst_fd: int) -> None:
+    """Undo a partial copy, so the next method starts from the beginning."""
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    os.ftruncate(dst_fd, 0)
+
+
+def _copy_chunks(copy_chunk: Callable[[], int], size: int) -> bool:
+    """
+    Call copy_chunk until it reports end of file by returning 0.
+    
+    Returns True only if at least size bytes were copied. Some
+    filesystems make copy_file_range return 0 straight away without
+    copying anything, and a call failing midway leaves the copy short.
+    """
+    copied = 0
+    try:
+        while True:
+            n = copy_chunk()
+            if not n:
+                break
+            copied += n
+    except OSError:  # E.g. EXDEV on older kernels
+        return False
+    return copied >= size
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int) -> bool:
+    """
+    Copy file contents without passing them through user space.
+    
+    Tries a reflink clone first, then os.copy_file_range, then
+    os.sendfile. A method counts only if it copied all size bytes.
+    Returns False, with both files rewound, if none of them is supported
+    for these files.
+    """
+    if fcntl is not None and sys.platform.startswith('linux'):  # FICLONE is Linux's number
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return True
+        except OSError:
+            pass  # Not a reflink-capable filesystem, or a different one
+    
+    if hasattr(os, 'copy_file_range'):  # Linux, Python >= 3.8
+        if _copy_chunks(lambda: os.copy_file_range(src_fd, dst_fd, 1 << 30), size):
+            return True
+        _rewind(src_fd, dst_fd)
+    
+    if sys.platform.startswith('linux'):  # Other platforms' sendfile needs a socket
+        if _copy_chunks(lambda: os.sendfile(dst_fd, src_fd, None, 1 << 30), size):
+            return True
+        _rewind(src_fd, dst_fd)
+    
+    return False
+
+
+def _advise(fd: int, advice: str) -> None:
+    """Give the kernel a page-cache hint for a whole file, if it takes one."""
+    if hasattr(os, 'posix_fadvise'):  # Not on macOS or Windows
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+        except OSError:
+            pass  # Only a hint
+
+
+def _copy_file(source_path: Path, dest_path: Path) -> int:
+    """
+    Copy a file with its metadata, like shutil.copy2.
+    
+    Contents are copied in the kernel when possible and through a
+    user-space buffer otherwise, reusing the same open files either way.
+    
+    Returns:
+        Number of bytes copied
+    """
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        size = os.fstat(src.fileno()).st_size
+        # Ask for aggressive readahead, since the whole file is read once
+        _advise(src.fileno(), 'POSIX_FADV_SEQUENTIAL')
+        
+        if not _kernel_copy(src.fileno(), dst.fileno(), size):
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        
+        # Organizing is the last stage, so nothing rereads the source; drop
+        # its pages rather than let them crowd out other data. The
+        # destination's pages are still dirty, so advice is moot there
+        _advise(src.fileno(), 'POSIX_FADV_DONTNEED')
+    
+    shutil.copystat(source_path, dest_path)
+    return size
+
+
+def _dumps(obj: object, indent: bool = False) -> str:
+    """Encode obj as JSON, two-space indented if indent is set."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def _write_report_json(f, fields: Dict[str, object]) -> None:
+    """
+    Write a two-space indented JSON object, one top-level field at a time.
+    
+    Iterator values are written as lists item by item, so a large list of
+    copy results never has to exist as one encoded string.
+    """
+    f.write('{')
+    for n, (key, value) in enumerate(fields.items()):
+        f.write(('\n  ' if n == 0 else ',\n  ') + _dumps(key) + ': ')
+        if isinstance(value, Iterator):
+            f.write('[')
+            empty = True
+            for item in value:
+                f.write(('\n    ' if empty else ',\n    ') + _dumps(item, indent=True).replace('\n', '\n    '))
+                empty = False
+            f.write(']' if empty else '\n  ]')
+        else:
+            f.write(_dumps(value, indent=True).replace('\n', '\n  '))
+    f.write('\n}' if fields else '}')
+
+
+def _file_digest(path: Path, size: int, sample_only: bool) -> Optional[bytes]:
+    """
+    Digest a file's contents, or only its first and last sample bytes.
+    
+    Uses blake3 when installed, memory-mapping and hashing large files
+    across all cores, and falls back to hashlib's blake2b otherwise.
+    Samples that don't cover the whole file only prefilter candidates,
+    so those use the non-cryptographic xxh3 when installed. Returns None
+    if the file can't be read.
+    """
+    try:
+        if blake3 is not None and not sample_only and size >= BLAKE3_MMAP_MIN_BYTES:
+            return blake3.blake3(max_threads=blake3.blake3.AUTO).update_mmap(str(path)).digest()
+        
+        if xxhash is not None and sample_only and size > 2 * EXACT_DEDUPE_SAMPLE_BYTES:
+            digest = xxhash.xxh3_128()
+        elif blake3 is not None:
+            digest = blake3.blake3()
+        else:
+            digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            if sample_only:
+                digest.update(f.read(EXACT_DEDUPE_SAMPLE_BYTES))
+                if size > EXACT_DEDUPE_SAMPLE_BYTES:
+                    f.seek(max(EXACT_DEDUPE_SAMPLE_BYTES, size - EXACT_DEDUPE_SAMPLE_BYTES))
+                    digest.update(f.read(EXACT_DEDUPE_SAMPLE_BYTES))
+            else:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def _fast_exact_dedupe(paths: List[Path]) -> Tuple[List[Path], Dict[Path, List[Path]]]:
+    """
+    Collapse byte-identical files to a single representative.
+    
+    Files are grouped by size, then by a digest of their first and last
+    64 KiB, and only files still colliding after that are digested in full.
+    Most files are therefore never read at all, and none is read twice
+    unless it is larger than the sampled region and has a potential twin.
+    
+    Args:
+        paths: List of file paths
+        
+    Returns:
+        Tuple of (representatives, exact_duplicates). representatives keeps
+        the first path of every distinct file in input order, and
+        exact_duplicates maps each representative to its identical copies.
+    """
+    by_size = defaultdict(list)
+    for path in paths:
+        try:
+            by_size[os.stat(path).st_size].append(path)
+        except OSError:
+            pass  # Unreadable files are never merged
+    
+    exact_duplicates = {}
+    for size, same_size in by_size.items():
+        if len(same_size) < 2:
+            continue
+        
+        by_sample = defaultdict(list)
+        for path in same_size:
+            by_sample[_file_digest(path, size, sample_only=True)].append(path)
+        
+        for sample_digest, candidates in by_sample.items():
+            if sample_digest is None or len(candidates) < 2:
+                continue
+            
+            if size <= 2 * EXACT_DEDUPE_SAMPLE_BYTES:
+                identical_sets = [candidates]  # The sample covered every byte
+            else:
+                by_content = defaultdict(list)
+                for path in candidates:
+                    by_content[_file_digest(path, size, sample_only=False)].append(path)
+                identical_sets = [group for digest, group in by_content.items() if digest is not None]
+            
+            for identical in identical_sets:
+                if len(identical) > 1:
+                    exact_duplicates[identical[0]] = identical[1:]
+    
+    copies = {path for duplicates in exact_duplicates.values() for path in duplicates}
+    representatives = [path for path in paths if path not in copies]
+    
+    return representatives, exact_duplicates
+
+
+@dataclass(**PER_FILE_DATACLASS)
 class CopyResult:
     """Result of copying a file to the output directory."""
     source_path: Path
@@ -19,6 +288,7 @@ class CopyResult:
     success: bool
     error: Optional[str] = None
     bytes_copied: int = 0
+    method: Optional[str] = None  # 'copy' or 'hardlink'; None if nothing was written
 
 
 @dataclass
@@ -28,16 +298,32 @@ class OrganizationReport:
     unique_images_copied: int
     duplicate_groups_found: int
     total_space_saved: int
-    copy_results: List[CopyResult]
+    copy_results: List[CopyResult]  # Only the most recent ones when streamed to a file
     errors: List[str]
     timestamp: str
+    total_bytes_copied: Optional[int] = None
+    results_path: Optional[Path] = None  # NDJSON file holding every CopyResult
 
 
 class FileOrganizer:
     """Organizes and copies unique images to output directory."""
     
+    # Copy results kept in memory when they are streamed to a file
+    RECENT_RESULTS = 100
+    
+    # File in the output directory recording what earlier runs copied
+    MANIFEST_NAME = '.dedupe_manifest.json'
+    
+    # Consecutive files reordered by inode at a time when sequential_io is on
+    SEQUENTIAL_IO_WINDOW = 1024
+    
+    # Ways of placing an image in the output directory
+    LINK_MODES = ('copy', 'hardlink')
+    
     def __init__(self, output_directory: str, preserve_structure: bool = False, 
-                 dry_run: bool = False):
+                 dry_run: bool = False, copy_workers: Optional[int] = None,
+                 incremental: bool = False, sequential_io: bool = True,
+                 link_mode: str = 'copy'):
         """
         Initialize file organizer.
         
@@ -45,15 +331,41 @@ class FileOrganizer:
             output_directory: Target directory for unique images
             preserve_structure: Whether to maintain directory structure from source
             dry_run: If True, simulate operations without actually copying files
+            copy_workers: Number of threads copying files (default: 4 per CPU, at most 32)
+            incremental: Whether to skip images an earlier run already copied,
+                as long as neither the source nor its copy has changed since
+            sequential_io: Whether to read sources in inode order, which
+                roughly follows their placement on disk
+            link_mode: 'copy' to copy each image (reflinked where the
+                filesystem supports it), or 'hardlink' to link it instead
+                when source and output share a filesystem, falling back
+                to a copy when they don't
         """
+        if link_mode not in self.LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode}")
+        
         self.output_dir = Path(output_directory)
         self.preserve_structure = preserve_structure
         self.dry_run = dry_run
+        self.copy_workers = copy_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.incremental = incremental
+        self.sequential_io = sequential_io
+        self.link_mode = link_mode
         self.copied_names = set()  # Track copied filenames to handle conflicts
+        self._dir_contents: Dict[Path, Set[str]] = {}  # Names already on disk, per directory
+        self._created_dirs: Set[Path] = set()  # Destination directories known to exist
+        self._next_suffix: Dict[Tuple[Path, str, str], int] = {}  # First untried rename counter
+        
+        # Absolute source path -> (destination relative to output_dir, size, mtime_ns)
+        self._manifest: Dict[str, Tuple[str, int, int]] = {}
+        self._reused: Set[Path] = set()  # Planned destinations that are already up to date
+        self._replaced: Set[Path] = set()  # Planned destinations holding a stale copy
     
     def organize_images(self, duplicate_groups: List[DuplicateGroup], 
                        all_images: List[Path],
-                       show_progress: bool = True) -> OrganizationReport:
+                       show_progress: bool = True,
+                       results_path: Optional[Path] = None,
+                       hash_results: Optional[Iterable[ImageHashResult]] = None) -> OrganizationReport:
         """
         Organize images by copying unique ones to output directory.
         
@@ -61,6 +373,10 @@ class FileOrganizer:
             duplicate_groups: Groups of duplicate images
             all_images: All discovered images
             show_progress: Whether to show progress bar
+            results_path: Optional NDJSON file to stream every CopyResult to,
+                keeping only the most recent results in memory
+            hash_results: Optional hash results for the images, whose file
+                sizes dry runs report instead of statting the files
             
         Returns:
             OrganizationReport with results of the operation
@@ -68,66 +384,151 @@ class FileOrganizer:
         # Create output directory if it doesn't exist
         if not self.dry_run:
             self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(self.output_dir)
         
-        # Get set of images that are representatives of duplicate groups
-        representatives = {group.representative.file_path for group in duplicate_groups}
+        if self.incremental:
+            self._manifest = self._load_manifest()
         
-        # Get set of all images in duplicate groups
-        duplicate_images = set()
+        # Collect the duplicates that lose to their group's representative
+        # (keyed by str, which is smaller than Path and caches its hash),
+        # and the space they take up, in a single pass over the groups
+        representatives = set()
+        skipped = set()
+        known_sizes = {}  # Measured by the hash stage, so a dry run needn't stat them
+        if self.dry_run and hash_results is not None:
+            for result in hash_results:
+                if not result.error:
+                    known_sizes[str(result.file_path)] = result.file_size
+        total_space_saved = 0
         for group in duplicate_groups:
-            duplicate_images.update(img.file_path for img in group.images)
+            representative = group.representative
+            representatives.add(str(representative.file_path))
+            for img in group.images:
+                skipped.add(str(img.file_path))
+                total_space_saved += img.file_size
+            total_space_saved -= representative.file_size
+            if self.dry_run:
+                known_sizes[str(representative.file_path)] = representative.file_size
+        skipped -= representatives  # A representative is always copied
         
         # Images to copy: representatives + images not in any duplicate group
-        images_to_copy = []
-        for img_path in all_images:
-            if img_path in representatives or img_path not in duplicate_images:
-                images_to_copy.append(img_path)
+        images_to_copy = [img_path for img_path in all_images if str(img_path) not in skipped]
+        
+        # Resolve every destination up front, so the copies that follow
+        # are independent of each other
+        source_root = all_images[0].parent if all_images else None
+        planned = []
+        for source_path in images_to_copy:
+            try:
+                planned.append((source_path, self._plan_destination(source_path, source_root)))
+            except Exception as e:
+                planned.append((source_path, e))
         
         # Copy the images
-        copy_results = []
+        copy_results = [] if results_path is None else deque(maxlen=self.RECENT_RESULTS)
         errors = []
+        unique_images_copied = 0
+        total_bytes_copied = 0
         
-        iterator = images_to_copy
-        if show_progress:
-            action = "Simulating copy" if self.dry_run else "Copying"
-            iterator = tqdm(images_to_copy, desc=f"{action} unique images", unit="files")
-        
-        for source_path in iterator:
+        def run(plan):
+            source_path, dest_path = plan
             try:
-                result = self._copy_image(source_path, all_images[0].parent if all_images else None)
-                copy_results.append(result)
-                if not result.success:
-                    errors.append(f"Failed to copy {source_path}: {result.error}")
+                if isinstance(dest_path, Exception):
+                    result = CopyResult(source_path=source_path, destination_path=Path(),
+                                        success=False, error=str(dest_path))
+                else:
+                    result = self._execute_copy(source_path, dest_path,
+                                                known_sizes.get(str(source_path)))
             except Exception as e:
-                error_msg = f"Unexpected error copying {source_path}: {e}"
-                errors.append(error_msg)
-                copy_results.append(CopyResult(
+                return CopyResult(
                     source_path=source_path,
                     destination_path=Path(),
                     success=False,
                     error=str(e)
-                ))
+                ), f"Unexpected error copying {source_path}: {e}"
+            
+            if not result.success:
+                return result, f"Failed to copy {source_path}: {result.error}"
+            return result, None
         
-        # Calculate statistics
-        successful_copies = [r for r in copy_results if r.success]
-        total_bytes_copied = sum(r.bytes_copied for r in successful_copies)
+        # Copies spend their time in the kernel, so threads overlap them;
+        # a dry run only stats files and stays serial
+        workers = 1 if self.dry_run else min(self.copy_workers, len(planned))
         
-        # Calculate space saved from duplicates
-        total_space_saved = sum(
-            sum(img.file_size for img in group.images) - group.representative.file_size
-            for group in duplicate_groups
-        )
+        # Copy in an order that saves the disk seeking, but still report in
+        # input order
+        order = self._copy_order(planned) if self.sequential_io and not self.dry_run else None
+        jobs = planned if order is None else [planned[index] for index in order]
+        
+        results_file = open(results_path, 'w', encoding='utf-8') if results_path is not None else None
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                results = executor.map(run, jobs) if workers > 1 else map(run, jobs)
+                if order is not None:
+                    results = _in_order(results, order)
+                
+                if show_progress:
+                    action = "Simulating copy" if self.dry_run else "Copying"
+                    results = tqdm(results, total=len(planned),
+                                   desc=f"{action} unique images", unit="files")
+                
+                for result, error in results:
+                    copy_results.append(result)
+                    if results_file is not None:
+                        results_file.write(_dumps(self._copy_result_to_dict(result)) + '\n')
+                    if result.success:
+                        unique_images_copied += 1
+                        total_bytes_copied += result.bytes_copied
+                        if self.incremental and not self.dry_run:
+                            self._record_copy(result)
+                    if error:
+                        errors.append(error)
+        finally:
+            if results_file is not None:
+                results_file.close()
+        
+        if self.incremental and not self.dry_run:
+            self._save_manifest()
         
         return OrganizationReport(
             total_input_images=len(all_images),
-            unique_images_copied=len(successful_copies),
+            unique_images_copied=unique_images_copied,
             duplicate_groups_found=len(duplicate_groups),
             total_space_saved=total_space_saved,
-            copy_results=copy_results,
+            copy_results=list(copy_results),
             errors=errors,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            total_bytes_copied=total_bytes_copied,
+            results_path=results_path
         )
     
+    def _copy_order(self, planned: List[Tuple[Path, object]]) -> List[int]:
+        """
+        Order planned copies by source inode, one window of files at a time.
+        
+        Filesystems tend to allocate inodes near the data they describe, so
+        this turns a directory listing's arbitrary order into mostly forward
+        reads. Sorting only within windows keeps _in_order's buffer small.
+        
+        Args:
+            planned: (source path, destination) pairs in input order
+            
+        Returns:
+            Permutation of the indices of planned
+        """
+        inodes = []
+        for source_path, _ in planned:
+            try:
+                inodes.append(os.stat(source_path).st_ino)
+            except OSError:
+                inodes.append(0)  # The copy will report the error
+        
+        order = []
+        for start in range(0, len(planned), self.SEQUENTIAL_IO_WINDOW):
+            window = range(start, min(start + self.SEQUENTIAL_IO_WINDOW, len(planned)))
+            order.extend(sorted(window, key=inodes.__getitem__))
+        return order
+    
     def _copy_image(self, source_path: Path, source_root: Optional[Path] = None) -> CopyResult:
         """
         Copy a single image to the output directory.
@@ -140,47 +541,188 @@ class FileOrganizer:
             CopyResult indicating success/failure
         """
         try:
-            # Determine destination path
-            if self.preserve_structure and source_root:
-                # Preserve directory structure
-                try:
-                    relative_path = source_path.relative_to(source_root)
-                    dest_path = self.output_dir / relative_path
-                except ValueError:
-                    # Fallback if can't make relative path
-                    dest_path = self.output_dir / source_path.name
-            else:
-                # Flat structure
-                dest_path = self.output_dir / source_path.name
+            dest_path = self._plan_destination(source_path, source_root)
+        except Exception as e:
+            return CopyResult(
+                source_path=source_path,
+                destination_path=Path(),
+                success=False,
+                error=str(e)
+            )
+        
+        return self._execute_copy(source_path, dest_path)
+    
+    def _plan_destination(self, source_path: Path, source_root: Optional[Path] = None) -> Path:
+        """
+        Choose and reserve the destination path for an image.
+        
+        Args:
+            source_path: Source image file path
+            source_root: Root directory of source (for preserving structure)
             
+        Returns:
+            Destination path, already free of filename conflicts
+        """
+        dest_path = self._default_destination(source_path, source_root)
+        
+        previous = self._previous_copy(source_path, dest_path) if self.incremental else None
+        if previous is not None:
+            # Keep the earlier copy's name, copying over it only if it's stale
+            dest_path, up_to_date = previous
+            if up_to_date:
+                self._reused.add(dest_path)
+            else:
+                self._replaced.add(dest_path)
+        else:
             # Handle filename conflicts
             dest_path = self._resolve_filename_conflict(dest_path)
+        
+        # Track the filename now so later plans don't pick it too
+        self.copied_names.add(dest_path.name)
+        
+        return dest_path
+    
+    def _default_destination(self, source_path: Path, source_root: Optional[Path] = None) -> Path:
+        """Get the destination path for an image, before resolving conflicts."""
+        # Determine destination path
+        if self.preserve_structure and source_root:
+            # Preserve directory structure
+            try:
+                relative_path = source_path.relative_to(source_root)
+                dest_path = self.output_dir / relative_path
+            except ValueError:
+                # Fallback if can't make relative path
+                dest_path = self.output_dir / source_path.name
+        else:
+            # Flat structure
+            dest_path = self.output_dir / source_path.name
+        
+        return dest_path
+    
+    def _previous_copy(self, source_path: Path, default_dest: Path) -> Optional[Tuple[Path, bool]]:
+        """
+        Find the copy of an image made by an earlier run.
+        
+        Args:
+            source_path: Source image file path
+            default_dest: Destination the image would get without conflicts
             
-            # Create destination directory if needed
-            if not self.dry_run:
+        Returns:
+            Tuple of (destination path, whether it is still up to date), or
+            None if there is no earlier copy this run can use
+        """
+        entry = self._manifest.get(os.path.abspath(source_path))
+        if entry is None:
+            return None
+        
+        relative_path, size, mtime_ns = entry
+        dest_path = self.output_dir / relative_path
+        if dest_path.parent != default_dest.parent or dest_path.name in self.copied_names:
+            return None  # Copied with another layout, or the name is taken this run
+        
+        # Copies keep their source's mtime, so both must still match the record
+        try:
+            source_stat = os.stat(source_path)
+            dest_stat = os.stat(dest_path)
+        except OSError:
+            return dest_path, False
+        up_to_date = ((source_stat.st_size, source_stat.st_mtime_ns) == (size, mtime_ns)
+                      and (dest_stat.st_size, dest_stat.st_mtime_ns) == (size, mtime_ns))
+        
+        return dest_path, up_to_date
+    
+    def _load_manifest(self) -> Dict[str, Tuple[str, int, int]]:
+        """Read the manifest of earlier copies, empty if there is none."""
+        try:
+            with open(self.output_dir / self.MANIFEST_NAME, encoding='utf-8') as f:
+                files = json.load(f)['files']
+            return {source: tuple(entry) for source, entry in files.items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}  # Missing or unreadable: copy everything again
+    
+    def _record_copy(self, result: CopyResult) -> None:
+        """Add a successful copy to the manifest."""
+        if result.destination_path in self._reused:
+            return  # Its entry is still accurate
+        
+        try:
+            dest_stat = os.stat(result.destination_path)
+        except OSError:
+            return
+        
+        self._manifest[os.path.abspath(result.source_path)] = (
+            str(result.destination_path.relative_to(self.output_dir)),
+            dest_stat.st_size,
+            dest_stat.st_mtime_ns
+        )
+    
+    def _save_manifest(self) -> None:
+        """Write the manifest, replacing the previous one in a single step."""
+        manifest_path = self.output_dir / self.MANIFEST_NAME
+        temp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(_dumps({'files': self._manifest}))
+        os.replace(temp_path, manifest_path)
+    
+    def _execute_copy(self, source_path: Path, dest_path: Path,
+                      file_size: Optional[int] = None) -> CopyResult:
+        """
+        Copy an image to a destination chosen by _plan_destination.
+        
+        Args:
+            source_path: Source image file path
+            dest_path: Planned destination path
+            file_size: Size of the source if already known, reported by
+                dry runs instead of statting the file
+            
+        Returns:
+            CopyResult indicating success/failure
+        """
+        if self._reused and dest_path in self._reused:  # Skip hashing the Path when empty
+            # An earlier run already copied this image
+            return CopyResult(
+                source_path=source_path,
+                destination_path=dest_path,
+                success=True
+            )
+        
+        try:
+            # Create destination directory if needed, once per directory
+            if not self.dry_run and dest_path.parent not in self._created_dirs:
                 dest_path.parent.mkdir(parents=True, exist_ok=True)
+                self._created_dirs.add(dest_path.parent)
             
             # Copy the file
             bytes_copied = 0
+            method = None
             if self.dry_run:
                 # Simulate copy by getting file size
-                try:
-                    bytes_copied = source_path.stat().st_size
-                except:
-                    bytes_copied = 0
+                if file_size is not None:
+                    bytes_copied = file_size
+                else:
+                    try:
+                        bytes_copied = source_path.stat().st_size
+                    except:
+                        bytes_copied = 0
             else:
-                # Actually copy the file
-                shutil.copy2(source_path, dest_path)
-                bytes_copied = dest_path.stat().st_size
-            
-            # Track the copied filename
-            self.copied_names.add(dest_path.name)
+                if dest_path in self._replaced:
+                    # Unlink rather than write through it, in case the stale
+                    # copy is a hard link to the source
+                    dest_path.unlink(missing_ok=True)
+                
+                if self.link_mode == 'hardlink' and self._hard_link(source_path, dest_path):
+                    method = 'hardlink'
+                else:
+                    # Actually copy the file
+                    bytes_copied = _copy_file(source_path, dest_path)
+                    method = 'copy'
             
             return CopyResult(
                 source_path=source_path,
                 destination_path=dest_path,
                 success=True,
-                bytes_copied=bytes_copied
+                bytes_copied=bytes_copied,
+                method=method
             )
             
         except Exception as e:
@@ -191,6 +733,22 @@ class FileOrganizer:
                 error=str(e)
             )
     
+    def _hard_link(self, source_path: Path, dest_path: Path) -> bool:
+        """
+        Hard link an image into place instead of copying it.
+        
+        Returns:
+            False if the filesystem can't link these paths, e.g. because
+            they are on different devices, so the caller should copy
+        """
+        try:
+            os.link(source_path, dest_path)
+        except FileNotFoundError:
+            raise  # A missing source fails the copy too
+        except OSError:
+            return False  # EXDEV, EPERM, EMLINK, or no hard link support
+        return True
+    
     def _resolve_filename_conflict(self, dest_path: Path) -> Path:
         """
         Resolve filename conflicts by adding incremental numbers.
@@ -201,28 +759,55 @@ class FileOrganizer:
         Returns:
             Path that doesn't conflict with existing files
         """
-        if dest_path.name not in self.copied_names:
-            # Check if file actually exists (for non-dry-run mode)
-            if self.dry_run or not dest_path.exists():
-                return dest_path
+        # Names of files already in the target directory (for non-dry-run mode)
+        existing = () if self.dry_run else self._existing_names(dest_path.parent)
+        
+        name = dest_path.name
+        if name not in self.copied_names and name not in existing:
+            return dest_path
         
-        # Generate alternative names with incrementing numbers
-        counter = 1
+        # Generate alternative names with incrementing numbers. Taken names
+        # are never released, so the search resumes where the last one for
+        # this name stopped instead of probing from 1 again
         stem = dest_path.stem
         suffix = dest_path.suffix
+        key = (dest_path.parent, stem, suffix)
+        counter = self._next_suffix.get(key, 1)
         
         while True:
             new_name = f"{stem}_{counter}{suffix}"
-            new_path = dest_path.parent / new_name
             
-            if new_name not in self.copied_names:
-                if self.dry_run or not new_path.exists():
-                    return new_path
+            if new_name not in self.copied_names and new_name not in existing:
+                self._next_suffix[key] = counter
+                return dest_path.parent / new_name
             
             counter += 1
             if counter > 9999:  # Prevent infinite loop
                 raise ValueError(f"Too many filename conflicts for {dest_path.name}")
     
+    def _existing_names(self, directory: Path) -> Set[str]:
+        """
+        Get the names already present in a destination directory.
+        
+        Each directory is listed once with os.scandir and remembered, so
+        conflict checks don't need a stat per candidate name.
+        
+        Args:
+            directory: Destination directory
+            
+        Returns:
+            Set of entry names, empty if the directory doesn't exist yet
+        """
+        names = self._dir_contents.get(directory)
+        if names is None:
+            try:
+                with os.scandir(directory) as it:
+                    names = {entry.name for entry in it}
+            except (FileNotFoundError, NotADirectoryError):
+                names = set()
+            self._dir_contents[directory] = names
+        return names
+    
     def save_report(self, report: OrganizationReport, report_path: Optional[Path] = None) -> Path:
         """
         Save organization report to JSON file.
@@ -248,25 +833,30 @@ class FileOrganizer:
                 'total_space_saved_mb': round(report.total_space_saved / 1024 / 1024, 2),
                 'timestamp': report.timestamp
             },
-            'copy_results': [
-                {
-                    'source_path': str(result.source_path),
-                    'destination_path': str(result.destination_path),
-                    'success': result.success,
-                    'error': result.error,
-                    'bytes_copied': result.bytes_copied
-                }
-                for result in report.copy_results
-            ],
+            'copy_results': (self._copy_result_to_dict(result) for result in report.copy_results),
             'errors': report.errors
         }
+        if report.results_path is not None:
+            # copy_results above only holds the most recent results
+            report_data['copy_results_path'] = str(report.results_path)
         
         if not self.dry_run:
-            with open(report_path, 'w') as f:
-                json.dump(report_data, f, indent=2)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                _write_report_json(f, report_data)
         
         return report_path
     
+    def _copy_result_to_dict(self, result: CopyResult) -> Dict[str, object]:
+        """Convert a CopyResult to a JSON-serializable dictionary."""
+        return {
+            'source_path': str(result.source_path),
+            'destination_path': str(result.destination_path),
+            'success': result.success,
+            'error': result.error,
+            'bytes_copied': result.bytes_copied,
+            'method': result.method
+        }
+    
     def print_report(self, report: OrganizationReport) -> None:
         """Print a human-readable organization report."""
         print(f"\n=== FILE ORGANIZATION REPORT ===")
@@ -276,9 +866,20 @@ class FileOrganizer:
         print(f"Duplicate groups found: {report.duplicate_groups_found}")
         print(f"Space saved by deduplication: {report.total_space_saved:,} bytes ({report.total_space_saved/1024/1024:.1f} MB)")
         
-        successful_copies = [r for r in report.copy_results if r.success]
-        if successful_copies:
-            total_copied = sum(r.bytes_copied for r in successful_copies)
+        # Reports built by organize_images carry running totals, since
+        # copy_results may only hold the most recent results
+        if report.total_bytes_copied is not None:
+            any_copied = report.unique_images_copied > 0
+            total_copied = report.total_bytes_copied
+        else:
+            # One pass, without collecting the successful results in a list
+            any_copied = False
+            total_copied = 0
+            for result in report.copy_results:
+                if result.success:
+                    any_copied = True
+                    total_copied += result.bytes_copied
+        if any_copied:
             print(f"Total data copied: {total_copied:,} bytes ({total_copied/1024/1024:.1f} MB)")
         
         if report.errors:
@@ -295,7 +896,9 @@ class FileOrganizer:
 
 def organize_images(duplicate_groups: List[DuplicateGroup], all_images: List[Path],
                    output_directory: str, preserve_structure: bool = False,
-                   dry_run: bool = False) -> OrganizationReport:
+                   dry_run: bool = False, copy_workers: Optional[int] = None,
+                   incremental: bool = False, sequential_io: bool = True,
+                   link_mode: str = 'copy') -> OrganizationReport:
     """
     Convenience function to organize images.
     
@@ -305,11 +908,16 @@ def organize_images(duplicate_groups: List[DuplicateGroup], all_images: List[Pat
         output_directory: Target directory for unique images
         preserve_structure: Whether to maintain directory structure
         dry_run: If True, simulate operations without copying
+        copy_workers: Number of threads copying files (default: 4 per CPU, at most 32)
+        incremental: Whether to skip images an earlier run already copied
+        sequential_io: Whether to read sources in inode order
+        link_mode: 'copy' or 'hardlink'
         
     Returns:
         OrganizationReport with results
     """
-    organizer = FileOrganizer(output_directory, preserve_structure, dry_run)
+    organizer = FileOrganizer(output_directory, preserve_structure, dry_run, copy_workers,
+                              incremental, sequential_io, link_mode)
     return organizer.organize_images(duplicate_groups, all_images)
 
 
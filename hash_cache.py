@@ -0,0 +1,168 @@
+"""
+Persistent hash cache module for skipping re-hashing of unchanged images.
+"""
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from hash_generator import ImageHashResult, HashGenerator
+
+
+class HashCache:
+    """Stores image hash results in sqlite, keyed by path, mtime and size."""
+    
+    DEFAULT_PATH = Path.home() / '.dedupe_cache.db'
+    
+    # Maximum number of paths per SELECT (sqlite's default variable limit is 999)
+    QUERY_BATCH_SIZE = 500
+    
+    def __init__(self, cache_path: Optional[Path] = None):
+        """
+        Initialize hash cache.
+        
+        Args:
+            cache_path: Path to the sqlite database (default: ~/.dedupe_cache.db)
+        """
+        self.cache_path = Path(cache_path) if cache_path else self.DEFAULT_PATH
+        self.connection = sqlite3.connect(str(self.cache_path))
+        
+        # Stat info captured at lookup time for paths that missed the cache
+        self._pending: Dict[Path, Tuple[str, int, int]] = {}
+        
+        self._init_schema()
+    
+    def _init_schema(self) -> None:
+        """Create the hash table, discarding entries from older hash versions."""
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        
+        with self.connection:
+            if version != HashGenerator.HASH_VERSION:
+                self.connection.execute("DROP TABLE IF EXISTS hashes")
+                self.connection.execute(f"PRAGMA user_version = {int(HashGenerator.HASH_VERSION)}")
+            
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS hashes (
+                    path TEXT NOT NULL,
+                    hash_size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    ahash TEXT NOT NULL,
+                    dhash TEXT NOT NULL,
+                    phash TEXT NOT NULL,
+                    width INTEGER NOT NULL,
+                    height INTEGER NOT NULL,
+                    format TEXT NOT NULL,
+                    PRIMARY KEY (path, hash_size)
+                )
+            """)
+    
+    def get_many(self, image_paths: List[Path], hash_size: int) -> Dict[Path, ImageHashResult]:
+        """
+        Look up cached hash results for a list of images.
+        
+        An entry only counts as a hit if the file's mtime and size still
+        match. Misses are remembered so put_many can store them later
+        against the stat info seen here.
+        
+        Args:
+            image_paths: List of image file paths
+            hash_size: Hash size the results must have been generated with
+        
+        Returns:
+            Dictionary mapping each cached path to its ImageHashResult
+        """
+        keys = {}
+        for image_path in image_paths:
+            try:
+                stat = os.stat(image_path)
+            except OSError:
+                continue  # Let the hash generator report the error
+            keys[os.path.abspath(image_path)] = (image_path, stat.st_mtime_ns, stat.st_size)
+        
+        cached = {}
+        abs_paths = list(keys)
+        for start in range(0, len(abs_paths), self.QUERY_BATCH_SIZE):
+            batch = abs_paths[start:start + self.QUERY_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(
+                f"SELECT path, mtime_ns, size, ahash, dhash, phash, width, height, format "
+                f"FROM hashes WHERE hash_size = ? AND path IN ({placeholders})",
+                [hash_size] + batch
+            )
+            
+            for abs_path, mtime_ns, size, ahash, dhash, phash, width, height, image_format in rows:
+                image_path, current_mtime, current_size = keys[abs_path]
+                if (mtime_ns, size) != (current_mtime, current_size):
+                    continue  # File changed since it was cached
+                
+                cached[image_path] = ImageHashResult(
+                    file_path=image_path,
+                    ahash=ahash,
+                    dhash=dhash,
+                    phash=phash,
+                    file_size=size,
+                    image_width=width,
+                    image_height=height,
+                    format=image_format
+                )
+        
+        for abs_path, (image_path, mtime_ns, size) in keys.items():
+            if image_path not in cached:
+                self._pending[image_path] = (abs_path, mtime_ns, size)
+        
+        return cached
+    
+    def put_many(self, hash_results: List[ImageHashResult], hash_size: int) -> int:
+        """
+        Store hash results in the cache.
+        
+        Failed results and images that were not looked up with get_many
+        first are skipped.
+        
+        Args:
+            hash_results: List of image hash results
+            hash_size: Hash size the results were generated with
+        
+        Returns:
+            Number of results stored
+        """
+        rows = []
+        for result in hash_results:
+            stat_info = self._pending.pop(result.file_path, None)
+            if result.error or stat_info is None:
+                continue
+            
+            abs_path, mtime_ns, size = stat_info
+            rows.append((
+                abs_path, hash_size, mtime_ns, size,
+                result.ahash, result.dhash, result.phash,
+                result.image_width, result.image_height, result.format
+            ))
+        
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        
+        return len(rows)
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == "__main__":
+    # Show cache statistics
+    import sys
+    
+    cache_path = Path(sys.argv[1]) if len(sys.argv) > 1 else HashCache.DEFAULT_PATH
+    with HashCache(cache_path) as cache:
+        count = cache.connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        print(f"{cache.cache_path}: {count:,} cached hash results")
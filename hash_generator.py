@@ -2,12 +2,20 @@
 Perceptual hash generation module for creating image fingerprints.
 """
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-import imagehash
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Sized, Tuple, Union
+import numpy as np
 from PIL import Image
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
+from collections import OrderedDict
 import os
+import threading
+
+
+# Hash attributes of ImageHashResult, in the order hash_values() uses
+HASH_ALGORITHMS = ('ahash', 'dhash', 'phash')
 
 
 @dataclass
@@ -22,31 +30,289 @@ class ImageHashResult:
     image_height: int
     format: str
     error: Optional[str] = None
+    
+    # Optional downscaled grayscale pixels, kept by a HashGenerator with
+    # thumbnail_size set so quality checks needn't decode the image again
+    gray_thumbnail: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    
+    # (hex length, value) per hash, parsed on first use; see hash_values()
+    _hash_values: Optional[Tuple[Optional[Tuple[int, int]], ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def hash_values(self) -> Tuple[Optional[Tuple[int, int]], ...]:
+        """
+        Get the aHash, dHash and pHash as ints, parsing them only once.
+        
+        Returns:
+            One (hex length, value) tuple per hash, in HASH_ALGORITHMS
+            order, or None in place of an empty or non-hex hash
+        """
+        values = self._hash_values
+        if values is None:
+            values = self._hash_values = tuple(
+                _parse_hash(getattr(self, algorithm)) for algorithm in HASH_ALGORITHMS
+            )
+        return values
+
+
+def _parse_hash(hash_str: str) -> Optional[Tuple[int, int]]:
+    """Parse a hex hash string to (length, value), or None if empty or not hex."""
+    if not hash_str:
+        return None
+    try:
+        return len(hash_str), int(hash_str, 16)
+    except ValueError:
+        return None
+
+
+# Count the set bits in a non-negative int
+if hasattr(int, 'bit_count'):  # Python >= 3.10
+    bit_count = int.bit_count
+else:
+    def bit_count(value: int) -> int:
+        return bin(value).count('1')
+
+
+# Set-bit counts for every byte value, used when np.bitwise_count is missing
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Count the set bits in each element of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return np.bitwise_count(values)
+    counts = _POPCOUNT_TABLE[values.view(np.uint8)]
+    return counts.reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def hamming_distances(words1: np.ndarray, words2: np.ndarray) -> np.ndarray:
+    """
+    Hamming distances between matching rows of two packed hash arrays.
+    
+    Args:
+        words1: Packed hashes, shape (N,) or (N, hash_words)
+        words2: Packed hashes with the same shape as words1
+        
+    Returns:
+        Array of N bit distances
+    """
+    if words1.ndim == 1:  # One word per hash, nothing to sum
+        return popcount64(words1 ^ words2)
+    return popcount64(words1 ^ words2).sum(axis=1)
+
+
+@dataclass
+class ImageHashTable:
+    """
+    Column-oriented collection of image hash results.
+    
+    Holds one list or array per ImageHashResult field instead of one
+    object per image, which is far smaller for large collections and lets
+    the numeric columns be used directly by NumPy. Indexing and iteration
+    still give ImageHashResult rows.
+    """
+    paths: List[Path]
+    ahash: List[str]
+    dhash: List[str]
+    phash: List[str]
+    file_sizes: np.ndarray  # int64
+    widths: np.ndarray      # int32
+    heights: np.ndarray     # int32
+    formats: List[str]
+    errors: List[Optional[str]]
+    
+    @classmethod
+    def from_results(cls, hash_results: Iterable[ImageHashResult]) -> 'ImageHashTable':
+        """
+        Build a table from hash results, consuming them one at a time.
+        
+        Args:
+            hash_results: Iterable of image hash results
+            
+        Returns:
+            ImageHashTable with one row per result, in input order
+        """
+        columns = ([], [], [], [], [], [], [], [], [])
+        for r in hash_results:
+            for column, value in zip(columns, (r.file_path, r.ahash, r.dhash, r.phash, r.file_size,
+                                               r.image_width, r.image_height, r.format, r.error)):
+                column.append(value)
+        
+        paths, ahash, dhash, phash, sizes, widths, heights, formats, errors = columns
+        return cls(
+            paths=paths, ahash=ahash, dhash=dhash, phash=phash,
+            file_sizes=np.array(sizes, dtype=np.int64),
+            widths=np.array(widths, dtype=np.int32),
+            heights=np.array(heights, dtype=np.int32),
+            formats=formats, errors=errors
+        )
+    
+    def take(self, indices: Iterable[int]) -> 'ImageHashTable':
+        """Return a new table holding only the given rows, in the given order."""
+        indices = np.asarray(list(indices), dtype=np.intp)
+        return ImageHashTable(
+            paths=[self.paths[i] for i in indices],
+            ahash=[self.ahash[i] for i in indices],
+            dhash=[self.dhash[i] for i in indices],
+            phash=[self.phash[i] for i in indices],
+            file_sizes=self.file_sizes[indices],
+            widths=self.widths[indices],
+            heights=self.heights[indices],
+            formats=[self.formats[i] for i in indices],
+            errors=[self.errors[i] for i in indices]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def __getitem__(self, index: int) -> ImageHashResult:
+        return ImageHashResult(
+            file_path=self.paths[index],
+            ahash=self.ahash[index],
+            dhash=self.dhash[index],
+            phash=self.phash[index],
+            file_size=int(self.file_sizes[index]),
+            image_width=int(self.widths[index]),
+            image_height=int(self.heights[index]),
+            format=self.formats[index],
+            error=self.errors[index]
+        )
+    
+    def __iter__(self) -> Iterator[ImageHashResult]:
+        return (self[i] for i in range(len(self)))
+
+
+def _bits_to_hex(bits: np.ndarray) -> str:
+    """
+    Format a boolean hash array as a hex string, row-major, like imagehash.
+    
+    The bits are read as one big-endian integer and zero-padded on the
+    left to ceil(bits / 4) digits, so sizes that aren't whole bytes
+    format the same as imagehash too.
+    """
+    bits = bits.ravel()
+    packed = np.packbits(bits).tobytes()
+    spare = -bits.size % 8
+    if not spare:
+        return packed.hex()
+    
+    # packbits pads the last byte on the right; drop the padding
+    value = int.from_bytes(packed, 'big') >> spare
+    return f'{value:0{-(-bits.size // 4)}x}'
+
+
+@lru_cache(maxsize=None)
+def _dct_basis(hash_size: int) -> np.ndarray:
+    """
+    Return the first hash_size rows of the unnormalized DCT-II matrix.
+    
+    For a (4 * hash_size) square image, basis @ pixels @ basis.T equals
+    the top-left hash_size x hash_size block of scipy.fftpack's 2-D
+    DCT-II, without computing the coefficients pHash throws away.
+    """
+    n = hash_size * 4
+    k = np.arange(hash_size)[:, None]
+    return 2 * np.cos(np.pi * k * (2 * np.arange(n) + 1) / (2 * n))
+
+
+# Per-process HashGenerator, created on first use in each worker
+_worker_generator = None
+
+
+def _hash_one_image(image_path: Path, hash_size: int,
+                    thumbnail_size: Optional[int] = None) -> 'ImageHashResult':
+    """Hash one image in a worker process."""
+    global _worker_generator
+    if (_worker_generator is None or _worker_generator.hash_size != hash_size
+            or _worker_generator.thumbnail_size != thumbnail_size):
+        _worker_generator = HashGenerator(hash_size=hash_size, thumbnail_size=thumbnail_size)
+    return _worker_generator.generate_hash(image_path)
+
+
+def gray_thumbnail(gray_img: Image.Image, max_size: int) -> np.ndarray:
+    """
+    Downscale a grayscale image to fit max_size and return its pixels.
+    
+    Args:
+        gray_img: Image in mode 'L'
+        max_size: Longest side allowed; smaller images are kept as they are
+        
+    Returns:
+        uint8 array of shape (height, width)
+    """
+    if max(gray_img.size) > max_size:
+        ratio = max_size / max(gray_img.size)
+        new_size = (int(gray_img.width * ratio), int(gray_img.height * ratio))
+        gray_img = gray_img.resize(new_size, Image.LANCZOS)
+    
+    return np.asarray(gray_img, dtype=np.uint8)
 
 
 class HashGenerator:
     """Generates perceptual hashes for images using multiple algorithms."""
     
-    def __init__(self, hash_size: int = 8):
+    # Bump whenever hash output changes so persisted hashes are invalidated
+    HASH_VERSION = 3
+    
+    # Smallest size JPEGs are drafted down to before hashing
+    DRAFT_SIZE = 64
+    
+    # Below this many images a worker pool costs more than it saves
+    PARALLEL_MIN_IMAGES = 32
+    
+    # Images per pool task when hashing a stream of unknown length
+    STREAM_CHUNKSIZE = 16
+    
+    # Most results generate_hash remembers for files hashed again unchanged
+    MEMO_SIZE = 1024
+    
+    def __init__(self, hash_size: int = 8, thumbnail_size: Optional[int] = None):
         """
         Initialize hash generator.
         
         Args:
             hash_size: Size of the hash (8 = 64-bit hash, 16 = 256-bit hash)
+            thumbnail_size: If set, keep each fully decoded image's grayscale
+                pixels, downscaled to fit this size, as gray_thumbnail for
+                QualityAssessor. JPEGs decoded at a reduced scale are skipped,
+                since that would change what quality checks see.
         """
         self.hash_size = hash_size
+        self.thumbnail_size = thumbnail_size
+        
+        # Recent results keyed by (path, mtime_ns, size), least recent first
+        self._memo: 'OrderedDict[Tuple[Path, int, int], ImageHashResult]' = OrderedDict()
+        self._memo_lock = threading.Lock()
     
-    def generate_hashes(self, image_paths: List[Path], show_progress: bool = True) -> List[ImageHashResult]:
+    def generate_hashes(self, image_paths: Iterable[Path], show_progress: bool = True,
+                        workers: Optional[int] = None,
+                        use_threads: bool = False) -> List[ImageHashResult]:
         """
         Generate perceptual hashes for a list of image files.
         
+        Large batches are spread over a pool of worker processes, or
+        threads; small ones are hashed in this process. A lazy iterable,
+        such as ImageScanner.iter_scan_directory, always goes to the pool,
+        whose workers start hashing while the iterable is still producing
+        paths.
+        
         Args:
-            image_paths: List of image file paths
+            image_paths: List or iterable of image file paths
             show_progress: Whether to show progress bar
+            workers: Number of worker processes (default: CPU count)
+            use_threads: Use 2 threads per worker instead of processes, which
+                suits many small files or slow storage, where decoding waits
+                on I/O rather than the CPU
             
         Returns:
-            List of ImageHashResult objects
+            List of ImageHashResult objects in the same order as image_paths
         """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if self._use_pool(image_paths, workers):
+            return self._generate_hashes_parallel(image_paths, show_progress, workers, use_threads)
+        
         results = []
         
         iterator = image_paths
@@ -59,6 +325,111 @@ class HashGenerator:
         
         return results
     
+    def _use_pool(self, image_paths: Iterable[Path], workers: int) -> bool:
+        """Return whether image_paths is worth hashing on a worker pool."""
+        if workers <= 1:
+            return False
+        return not isinstance(image_paths, Sized) or len(image_paths) >= self.PARALLEL_MIN_IMAGES
+    
+    def _generate_hashes_parallel(self, image_paths: Iterable[Path], show_progress: bool,
+                                  workers: int, use_threads: bool = False) -> List[ImageHashResult]:
+        """
+        Generate hashes across a pool of worker processes or threads.
+        
+        Args:
+            image_paths: List or iterable of image file paths
+            show_progress: Whether to show progress bar
+            workers: Number of worker processes
+            use_threads: Use 2 threads per worker instead of processes
+            
+        Returns:
+            List of ImageHashResult objects in the same order as image_paths
+        """
+        if use_threads:
+            # PIL releases the GIL while decoding, so threads overlap well
+            executor = ThreadPoolExecutor(max_workers=workers * 2)
+            hash_one, chunksize = self.generate_hash, 1
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            hash_one = partial(_hash_one_image, hash_size=self.hash_size,
+                               thumbnail_size=self.thumbnail_size)
+            # Large chunks amortize pickling; four per worker keeps them balanced
+            if isinstance(image_paths, Sized):
+                chunksize = max(1, len(image_paths) // (workers * 4))
+            else:
+                chunksize = self.STREAM_CHUNKSIZE
+        
+        # Keep the caller's Path objects as they are handed to the pool
+        submitted = []
+        def submit_paths():
+            for image_path in image_paths:
+                submitted.append(image_path)
+                yield image_path
+        
+        with executor:
+            # Tasks are submitted as image_paths is consumed, so workers
+            # start on the first paths while a lazy input is still producing
+            results = executor.map(hash_one, submit_paths(), chunksize=chunksize)
+            if show_progress:
+                total = len(image_paths) if isinstance(image_paths, Sized) else None
+                results = tqdm(results, total=total, desc="Generating hashes", unit="images")
+            hash_results = list(results)
+        
+        if not use_threads:
+            # Results from worker processes carry unpickled copies of their
+            # paths; swap in the originals so each path exists only once
+            # and the string and hash it caches are shared downstream
+            for image_path, result in zip(submitted, hash_results):
+                result.file_path = image_path
+        
+        return hash_results
+    
+    def generate_hash_table(self, image_paths: Iterable[Path], show_progress: bool = True,
+                            workers: Optional[int] = None,
+                            use_threads: bool = False) -> ImageHashTable:
+        """
+        Generate perceptual hashes straight into an ImageHashTable.
+        
+        Hashed serially, results go into the table's columns one at a time,
+        so no per-image result list is ever held.
+        
+        Args:
+            image_paths: List or iterable of image file paths
+            show_progress: Whether to show progress bar
+            workers: Number of worker processes (default: CPU count)
+            use_threads: Use 2 threads per worker instead of processes
+            
+        Returns:
+            ImageHashTable with one row per image, in input order
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if self._use_pool(image_paths, workers):
+            return ImageHashTable.from_results(
+                self._generate_hashes_parallel(image_paths, show_progress, workers, use_threads)
+            )
+        
+        iterator = image_paths
+        if show_progress:
+            iterator = tqdm(image_paths, desc="Generating hashes", unit="images")
+        return ImageHashTable.from_results(self.iter_generate_hashes(iterator))
+    
+    def iter_generate_hashes(self, image_paths: Iterable[Path]) -> Iterator[ImageHashResult]:
+        """
+        Lazily generate perceptual hashes for a stream of image files.
+        
+        Paths are consumed one at a time, so this can be fed directly from
+        ImageScanner.iter_scan_directory without building a path list.
+        
+        Args:
+            image_paths: Iterable of image file paths
+            
+        Returns:
+            Iterator of ImageHashResult objects in input order
+        """
+        for image_path in image_paths:
+            yield self.generate_hash(image_path)
+    
     def generate_hash(self, image_path: Path) -> ImageHashResult:
         """
         Generate perceptual hashes for a single image.
@@ -70,35 +441,66 @@ class HashGenerator:
             ImageHashResult with hashes and metadata
         """
         try:
-            # Get file size
-            file_size = os.path.getsize(image_path)
-            
-            # Open and process image
-            with Image.open(image_path) as img:
-                # Convert to RGB if necessary (handles RGBA, P mode, etc.)
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Generate three types of perceptual hashes
-                ahash = str(imagehash.average_hash(img, hash_size=self.hash_size))
-                dhash = str(imagehash.dhash(img, hash_size=self.hash_size))
-                phash = str(imagehash.phash(img, hash_size=self.hash_size))
+            # Open the file once and take its size from the open handle
+            with open(image_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                file_size = stat.st_size
                 
-                # Get image dimensions and format
-                width, height = img.size
-                image_format = img.format or image_path.suffix.upper()[1:]
-                
-                return ImageHashResult(
-                    file_path=image_path,
-                    ahash=ahash,
-                    dhash=dhash,
-                    phash=phash,
-                    file_size=file_size,
-                    image_width=width,
-                    image_height=height,
-                    format=image_format
-                )
+                # An unchanged file hashes the same, so reuse a recent result
+                memo_key = (image_path, stat.st_mtime_ns, file_size)
+                with self._memo_lock:
+                    cached = self._memo.get(memo_key)
+                    if cached is not None:
+                        self._memo.move_to_end(memo_key)
+                        return cached
                 
+                with Image.open(f) as img:
+                    # Get image dimensions and format before draft() shrinks it
+                    width, height = img.size
+                    image_format = img.format or image_path.suffix.upper()[1:]
+                    
+                    # Let JPEG decode straight to a reduced grayscale image;
+                    # other formats ignore the hint
+                    draft_size = max(self.DRAFT_SIZE, self.hash_size * 4)
+                    img.draft('L', (draft_size, draft_size))
+                    
+                    # Other modes go through RGB first (handles RGBA, P mode,
+                    # etc.); grayscale images are already what the hashes use,
+                    # and the L -> RGB -> L round trip returns them unchanged
+                    if img.mode == 'L':
+                        gray = img
+                    else:
+                        if img.mode != 'RGB':
+                            img = img.convert('RGB')
+                        gray = img.convert('L')
+                    
+                    # Generate three types of perceptual hashes
+                    ahash, dhash, phash = self._hashes_from_gray(gray)
+                    
+                    # Reuse the decode for quality checks unless draft() shrank it
+                    thumbnail = None
+                    if self.thumbnail_size and gray.size == (width, height):
+                        thumbnail = gray_thumbnail(gray, self.thumbnail_size)
+            
+            result = ImageHashResult(
+                file_path=image_path,
+                ahash=ahash,
+                dhash=dhash,
+                phash=phash,
+                file_size=file_size,
+                image_width=width,
+                image_height=height,
+                format=image_format,
+                gray_thumbnail=thumbnail
+            )
+            
+            with self._memo_lock:
+                self._memo[memo_key] = result
+                if len(self._memo) > self.MEMO_SIZE:
+                    self._memo.popitem(last=False)
+            
+            return result
+            
         except Exception as e:
             # Return result with error for failed images
             return ImageHashResult(
@@ -113,6 +515,82 @@ class HashGenerator:
                 error=str(e)
             )
     
+    def _hashes_from_gray(self, gray: Image.Image) -> Tuple[str, str, str]:
+        """
+        Compute aHash, dHash and pHash from one grayscale image.
+        
+        Follows imagehash's average_hash, dhash and phash, but shares the
+        grayscale conversion and computes only the low-frequency DCT block.
+        The hex strings are identical, except on near-uniform images whose
+        DCT coefficients all sit at the median and differ only by rounding.
+        
+        Args:
+            gray: Grayscale (mode 'L') image
+            
+        Returns:
+            Tuple of (ahash, dhash, phash) hex strings
+        """
+        hash_size = self.hash_size
+        
+        pixels = np.asarray(gray.resize((hash_size, hash_size), Image.LANCZOS))
+        ahash = _bits_to_hex(pixels > pixels.mean())
+        
+        pixels = np.asarray(gray.resize((hash_size + 1, hash_size), Image.LANCZOS))
+        dhash = _bits_to_hex(pixels[:, 1:] > pixels[:, :-1])
+        
+        # Only the low-frequency block is needed, so two small matrix
+        # products replace imagehash's full 2-D DCT
+        pixels = np.asarray(gray.resize((hash_size * 4, hash_size * 4), Image.LANCZOS))
+        basis = _dct_basis(hash_size)
+        low_freq = basis @ pixels @ basis.T
+        phash = _bits_to_hex(low_freq > np.median(low_freq))
+        
+        return ahash, dhash, phash
+    
+    def pack_hashes(self, hash_results: Union[List[ImageHashResult], ImageHashTable],
+                    algorithms: Iterable[str] = HASH_ALGORITHMS
+                    ) -> Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """
+        Pack hex hash strings into uint64 words for vectorized comparison.
+        
+        Each hash is parsed once; hamming_distances then compares whole
+        arrays of packed hashes at a time.
+        
+        Args:
+            hash_results: List or table of image hash results
+            algorithms: Hash attributes to pack
+            
+        Returns:
+            Dictionary mapping each algorithm to a tuple of (words, lengths),
+            where words has shape (N, hash_words), or (N,) for hashes that
+            fit in a single word, and lengths holds each hash string's
+            length, or is None when every hash has the same non-zero
+            length
+            
+        Raises:
+            ValueError: If any hash is not a hex string
+        """
+        packed = {}
+        for algorithm in algorithms:
+            if isinstance(hash_results, ImageHashTable):
+                hashes = getattr(hash_results, algorithm)
+            else:
+                hashes = [getattr(result, algorithm) for result in hash_results]
+            lengths = np.array([len(h) for h in hashes], dtype=np.intp)
+            
+            # Left-pad every hash to a whole number of 64-bit words
+            n_words = max(1, -(-int(lengths.max()) // 16))
+            raw = bytes.fromhex(''.join(h.zfill(n_words * 16) for h in hashes))
+            
+            words = np.frombuffer(raw, dtype='>u8').astype(np.uint64)
+            if n_words > 1:
+                words = words.reshape(len(hash_results), n_words)
+            if lengths.min() > 0 and lengths.min() == lengths.max():
+                lengths = None  # Nothing to mask out
+            packed[algorithm] = (words, lengths)
+        
+        return packed
+    
     def hash_hamming_distance(self, hash1: str, hash2: str) -> int:
         """
         Calculate Hamming distance between two hash strings.
@@ -134,9 +612,12 @@ class HashGenerator:
             xor_result = h1_int ^ h2_int
             
             # Count set bits (Hamming distance)
-            return bin(xor_result).count('1')
+            return bit_count(xor_result)
         except ValueError:
-            # Fallback to character comparison if hex conversion fails
+            # Fallback to character comparison if hex conversion fails;
+            # ASCII strings compare as bytes, which iterate as plain ints
+            if hash1.isascii() and hash2.isascii():
+                hash1, hash2 = hash1.encode('ascii'), hash2.encode('ascii')
             return sum(c1 != c2 for c1, c2 in zip(hash1, hash2))
     
     def are_similar(self, hash1: str, hash2: str, threshold: int = 10) -> bool:
@@ -157,6 +638,33 @@ class HashGenerator:
         distance = self.hash_hamming_distance(hash1, hash2)
         return distance <= threshold
     
+    def are_results_similar(self, result1: ImageHashResult, result2: ImageHashResult,
+                            algorithm: str, threshold: int = 10) -> bool:
+        """
+        Check if one hash type of two results represents similar images.
+        
+        Same as are_similar on the hash strings, but compares the results'
+        cached hash values instead of parsing both strings every time.
+        
+        Args:
+            result1: First image hash result
+            result2: Second image hash result
+            algorithm: Hash attribute name ('ahash', 'dhash' or 'phash')
+            threshold: Maximum Hamming distance for similarity
+            
+        Returns:
+            True if images are considered similar
+        """
+        index = HASH_ALGORITHMS.index(algorithm)
+        entry1 = result1.hash_values()[index]
+        entry2 = result2.hash_values()[index]
+        if entry1 is None or entry2 is None or entry1[0] != entry2[0]:
+            # Empty, non-hex or mismatched hashes get are_similar's handling
+            return self.are_similar(getattr(result1, algorithm), getattr(result2, algorithm),
+                                    threshold)
+        
+        return bit_count(entry1[1] ^ entry2[1]) <= threshold
+    
     def get_consensus_similarity(self, result1: ImageHashResult, result2: ImageHashResult, 
                                 threshold: int = 10, require_agreement: int = 2) -> bool:
         """
@@ -177,29 +685,61 @@ class HashGenerator:
         agreements = 0
         
         # Check each hash type
-        if self.are_similar(result1.ahash, result2.ahash, threshold):
-            agreements += 1
-        if self.are_similar(result1.dhash, result2.dhash, threshold):
-            agreements += 1
-        if self.are_similar(result1.phash, result2.phash, threshold):
-            agreements += 1
+        for algorithm in HASH_ALGORITHMS:
+            if self.are_results_similar(result1, result2, algorithm, threshold):
+                agreements += 1
         
         return agreements >= require_agreement
 
 
-def generate_image_hashes(image_paths: List[Path], hash_size: int = 8) -> List[ImageHashResult]:
+def generate_image_hashes(image_paths: List[Path], hash_size: int = 8,
+                          workers: Optional[int] = None,
+                          use_threads: bool = False) -> List[ImageHashResult]:
     """
     Convenience function to generate hashes for image files.
     
     Args:
         image_paths: List of image file paths
         hash_size: Size of hash to generate
+        workers: Number of worker processes (default: CPU count)
+        use_threads: Use 2 threads per worker instead of processes
         
     Returns:
         List of ImageHashResult objects
     """
     generator = HashGenerator(hash_size)
-    return generator.generate_hashes(image_paths)
+    return generator.generate_hashes(image_paths, workers=workers, use_threads=use_threads)
+
+
+def generate_image_hashes_packed(image_paths: List[Path], hash_size: int = 8
+                                 ) -> Tuple[List[Path], np.ndarray]:
+    """
+    Convenience function to generate hashes packed into uint64 words.
+    
+    The words feed hamming_distances directly, so callers comparing many
+    images never parse the hex strings themselves. Images that fail to
+    hash are left out.
+    
+    Args:
+        image_paths: List of image file paths
+        hash_size: Size of hash to generate
+        
+    Returns:
+        Tuple of (paths, words): the successfully hashed paths, and their
+        aHash, dHash and pHash words with shape (N, 3), or (N, 3,
+        hash_words) for hashes longer than 64 bits
+    """
+    generator = HashGenerator(hash_size)
+    results = [result for result in generator.generate_hashes(image_paths) if not result.error]
+    
+    if not results:
+        n_words = -(-hash_size * hash_size // 64)
+        shape = (0, len(HASH_ALGORITHMS)) if n_words == 1 else (0, len(HASH_ALGORITHMS), n_words)
+        return [], np.empty(shape, dtype=np.uint64)
+    
+    packed = generator.pack_hashes(results)
+    words = np.stack([packed[algorithm][0] for algorithm in HASH_ALGORITHMS], axis=1)
+    return [result.file_path for result in results], words
 
 
 if __name__ == "__main__":
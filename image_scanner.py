@@ -2,69 +2,191 @@
 Image scanner module for recursively discovering image files in directories.
 """
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Set
+from typing import Iterator, List, Optional, Set, Tuple
 from tqdm import tqdm
 
 class ImageScanner:
     """Scans directories recursively to find image files."""
     
-    SUPPORTED_EXTENSIONS = {
+    SUPPORTED_EXTENSIONS = frozenset({
         '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', 
         '.webp', '.psd', '.raw', '.cr2', '.nef', '.arw', '.dng'
-    }
+    })
     
     def __init__(self, supported_extensions: Set[str] = None):
         """Initialize scanner with optional custom extensions."""
+        # Lowercased once here; the scan loop only does membership tests
         if supported_extensions:
-            self.supported_extensions = {ext.lower() for ext in supported_extensions}
+            self.supported_extensions = frozenset(ext.lower() for ext in supported_extensions)
         else:
             self.supported_extensions = self.SUPPORTED_EXTENSIONS
     
-    def scan_directory(self, directory_path: str, show_progress: bool = True) -> List[Path]:
+    def scan_directory(self, directory_path: str, show_progress: bool = True,
+                       workers: int = 1) -> List[Path]:
         """
         Recursively scan directory for image files.
         
+        Every returned path was a regular file in the directory listing
+        when it was scanned, so callers needn't stat it again to check.
+        
         Args:
             directory_path: Path to directory to scan
             show_progress: Whether to show progress bar
+            workers: Number of threads listing directories at once; the
+                results come back in the same order either way
             
         Returns:
             List of Path objects for found image files
         """
-        directory = Path(directory_path)
-        if not directory.exists():
-            raise FileNotFoundError(f"Directory not found: {directory_path}")
+        directory = self._validate_directory(directory_path)
         
-        if not directory.is_dir():
-            raise NotADirectoryError(f"Path is not a directory: {directory_path}")
-        
-        # First pass: count total files for progress bar
+        # Single pass; the total is unknown, so the bar just counts entries
+        pbar = None
         if show_progress:
-            print("Counting files...")
-            total_files = sum(1 for _ in directory.rglob('*') if _.is_file())
-        else:
-            total_files = None
+            pbar = tqdm(desc="Scanning for images", unit="files")
         
-        # Second pass: find image files
-        image_files = []
-        
-        file_iterator = directory.rglob('*')
-        if show_progress and total_files:
-            file_iterator = tqdm(file_iterator, 
-                               total=total_files,
-                               desc="Scanning for images",
-                               unit="files")
-        
-        for file_path in file_iterator:
-            if self._is_image_file(file_path):
-                image_files.append(file_path)
+        if workers > 1:
+            image_files = list(self._walk_images_threaded(directory, workers, pbar))
+        else:
+            image_files = list(self._walk_images(directory, pbar))
         
         if show_progress:
+            pbar.close()
             print(f"Found {len(image_files)} image files")
         
         return image_files
     
+    def iter_scan_directory(self, directory_path: str) -> Iterator[Path]:
+        """
+        Lazily yield image files found under a directory.
+        
+        Unlike scan_directory, no file list is built and images are yielded
+        as soon as they are found, so later stages can start immediately.
+        
+        Args:
+            directory_path: Path to directory to scan
+            
+        Returns:
+            Iterator of Path objects for found image files
+        """
+        directory = self._validate_directory(directory_path)
+        return self._walk_images(directory)
+    
+    def _walk_images(self, directory: Path, pbar: Optional[tqdm] = None) -> Iterator[Path]:
+        """
+        Yield image files under a directory in the same order as rglob.
+        
+        Symlinked directories are not followed and unreadable directories
+        are skipped, as with rglob.
+        
+        Args:
+            directory: Directory to walk
+            pbar: Optional progress bar, advanced per directory entry
+            
+        Returns:
+            Iterator of Path objects for found image files
+        """
+        pending = [str(directory)]
+        
+        while pending:
+            images, subdirectories = self._list_directory(pending.pop(), pbar)
+            yield from images
+            
+            # Visit subdirectories depth-first, in listing order
+            pending.extend(reversed(subdirectories))
+    
+    def _walk_images_threaded(self, directory: Path, workers: int,
+                              pbar: Optional[tqdm] = None) -> Iterator[Path]:
+        """
+        Walk a directory like _walk_images, listing directories on threads.
+        
+        scandir releases the GIL while it waits on the filesystem, so
+        several listings overlap. Listings are collected as they finish and
+        yielded in _walk_images order once the whole tree has been listed.
+        
+        Args:
+            directory: Directory to walk
+            workers: Number of listing threads
+            pbar: Optional progress bar, advanced per directory entry
+            
+        Returns:
+            Iterator of Path objects for found image files
+        """
+        listings = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            root = str(directory)
+            pending = {executor.submit(self._list_directory, root, pbar): root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    listings[path] = future.result()
+                    for subdirectory in listings[path][1]:
+                        pending[executor.submit(self._list_directory, subdirectory, pbar)] = subdirectory
+        
+        stack = [root]
+        while stack:
+            images, subdirectories = listings.pop(stack.pop())
+            yield from images
+            stack.extend(reversed(subdirectories))
+    
+    def _list_directory(self, path: str, pbar: Optional[tqdm] = None
+                        ) -> Tuple[List[Path], List[str]]:
+        """
+        List one directory's image files and subdirectories.
+        
+        Uses os.scandir so file types come from the directory listing
+        rather than a stat per file.
+        
+        Args:
+            path: Directory to list
+            pbar: Optional progress bar, advanced per directory entry
+            
+        Returns:
+            Tuple of (image files, subdirectory paths) in listing order;
+            both are empty if the directory can't be read
+        """
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except PermissionError:
+            return [], []
+        
+        extensions = self.supported_extensions
+        # str.endswith rejects most non-image names without splitting them
+        suffixes = tuple(extensions)
+        
+        images = []
+        subdirectories = []
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subdirectories.append(entry.path)
+                elif entry.name.lower().endswith(suffixes) and entry.is_file():
+                    if os.path.splitext(entry.name)[1].lower() in extensions:
+                        images.append(Path(entry.path))
+            except OSError:
+                continue  # Entry vanished or can't be stat'ed
+        
+        if pbar is not None:
+            pbar.update(len(entries))
+        
+        return images, subdirectories
+    
+    def _validate_directory(self, directory_path: str) -> Path:
+        """Return directory_path as a Path, raising if it is not a directory."""
+        directory = Path(directory_path)
+        if not directory.exists():
+            raise FileNotFoundError(f"Directory not found: {directory_path}")
+        
+        if not directory.is_dir():
+            raise NotADirectoryError(f"Path is not a directory: {directory_path}")
+        
+        return directory
+    
     def _is_image_file(self, file_path: Path) -> bool:
         """Check if file is a supported image format."""
         if not file_path.is_file():
@@ -75,15 +197,15 @@ class ImageScanner:
     
     def get_supported_extensions(self) -> Set[str]:
         """Return set of supported file extensions."""
-        return self.supported_extensions.copy()
+        return set(self.supported_extensions)
     
     def add_extension(self, extension: str) -> None:
         """Add a new supported file extension."""
-        self.supported_extensions.add(extension.lower())
+        self.supported_extensions = self.supported_extensions | {extension.lower()}
     
     def remove_extension(self, extension: str) -> None:
         """Remove a supported file extension."""
-        self.supported_extensions.discard(extension.lower())
+        self.supported_extensions = self.supported_extensions - {extension.lower()}
 
 
 def scan_for_images(directory_path: str, extensions: Set[str] = None) -> List[Path]:
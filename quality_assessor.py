@@ -2,15 +2,75 @@
 Quality assessment module for evaluating and comparing image quality.
 """
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import math
-from hash_generator import ImageHashResult
+import os
+import sys
+import threading
+from hash_generator import ImageHashResult, gray_thumbnail
 from PIL import Image
 import numpy as np
 
+try:
+    import cv2  # Optional: single-pass Laplacian for sharpness scoring
+except ImportError:
+    cv2 = None
 
-@dataclass
+
+# Longest side grayscale analysis is done at; larger images are downscaled
+ANALYSIS_MAX_SIZE = 1000
+
+# Dataclass options for scores kept once per image (slots need Python >= 3.10)
+PER_IMAGE_DATACLASS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def _prepare_gray(img: Image.Image) -> np.ndarray:
+    """Convert an image to one grayscale uint8 array for all pixel analyses."""
+    try:
+        gray_img = img.convert('L')  # One pass straight from the native mode
+    except ValueError:
+        gray_img = img.convert('RGB').convert('L')  # Modes PIL can't map to L directly
+    
+    # Resize if image is very large to speed up processing
+    return gray_thumbnail(gray_img, ANALYSIS_MAX_SIZE)
+
+
+def _laplacian_variance(gray: np.ndarray) -> float:
+    """
+    Variance of the 4-neighbour Laplacian of a grayscale uint8 array.
+    
+    Uses OpenCV when installed and an equivalent NumPy stencil otherwise;
+    both reflect the image at its borders.
+    """
+    # Arrays from PIL are already C-contiguous uint8, so this is free for
+    # them; callers' strided views get unit-stride rows for the stencil
+    gray = np.ascontiguousarray(gray, dtype=np.uint8)
+    
+    if cv2 is not None:
+        laplacian = cv2.Laplacian(gray, cv2.CV_32F, ksize=1)
+        _, stddev = cv2.meanStdDev(laplacian)
+        return float(stddev[0, 0]) ** 2
+    
+    # Laplacian values lie in [-1020, 1020], so int16 holds them exactly and
+    # the stencil can be accumulated in place in one buffer
+    padded = np.pad(gray, 1, mode='reflect')
+    laplacian = padded[:-2, 1:-1].astype(np.int16)
+    laplacian += padded[2:, 1:-1]
+    laplacian += padded[1:-1, :-2]
+    laplacian += padded[1:-1, 2:]
+    laplacian -= np.left_shift(gray, 2, dtype=np.int16)
+    
+    # Variance from exact integer sums: E[x^2] - E[x]^2
+    n = laplacian.size
+    total = int(laplacian.sum(dtype=np.int64))
+    squares = int(np.square(laplacian, dtype=np.int32).sum(dtype=np.int64))
+    return (squares * n - total * total) / (n * n)
+
+
+@dataclass(frozen=True, **PER_IMAGE_DATACLASS)
 class QualityScore:
     """Quality assessment result for an image."""
     file_path: Path
@@ -23,9 +83,44 @@ class QualityScore:
     watermark_confidence: float
 
 
+def _edge_densities(regions: np.ndarray) -> np.ndarray:
+    """
+    Mean absolute horizontal and vertical neighbour difference per region.
+    
+    Uses OpenCV's saturating absdiff on the uint8 pixels when installed;
+    otherwise all regions are differenced at once in int16 so they don't
+    wrap.
+    
+    Args:
+        regions: uint8 array of equally sized regions, shape (count, h, w)
+    
+    Returns:
+        float64 array with one edge density per region
+    """
+    if cv2 is not None:
+        return np.array([
+            (cv2.mean(cv2.absdiff(region[:, 1:], region[:, :-1]))[0] +
+             cv2.mean(cv2.absdiff(region[1:, :], region[:-1, :]))[0]) / 2
+            for region in regions
+        ], dtype=np.float64)
+    
+    widened = regions.astype(np.int16)
+    grad_x = np.diff(widened, axis=2)
+    grad_y = np.diff(widened, axis=1)
+    return (np.abs(grad_x, out=grad_x).mean(axis=(1, 2)) +
+            np.abs(grad_y, out=grad_y).mean(axis=(1, 2))) / 2
+
+
 class QualityAssessor:
     """Assesses image quality using multiple criteria."""
     
+    # Most pixel analyses remembered per assessor, for re-assessed files
+    PIXEL_CACHE_SIZE = 65536
+    
+    # Points per decade of pixels (100MP, log10 = 8, scores 100) and of bytes
+    RESOLUTION_LOG_SCALE = 100.0 / 8.0
+    SIZE_LOG_SCALE = 100.0 / 10.0
+    
     def __init__(self):
         """Initialize quality assessor with default weights."""
         self.format_weights = {
@@ -40,6 +135,19 @@ class QualityAssessor:
             'GIF': 40,     # Limited colors, old format
         }
         
+        # Size score multipliers; different formats have different size expectations
+        self.format_multipliers = {
+            'PSD': 1.0,    # PSD files are naturally large
+            'PNG': 1.2,    # PNG can be large due to lossless compression
+            'TIFF': 1.0,   # Similar to PSD
+            'TIF': 1.0,
+            'BMP': 0.8,    # BMP is large but not necessarily high quality
+            'WEBP': 1.5,   # WebP is efficient, smaller files can be high quality
+            'JPG': 2.0,    # JPG compression means size matters more
+            'JPEG': 2.0,
+            'GIF': 1.0,    # GIF has limited colors anyway
+        }
+        
         # Weights for combining different quality aspects
         self.score_weights = {
             'format': 0.30,      # 30% - file format quality
@@ -48,6 +156,14 @@ class QualityAssessor:
             'sharpness': 0.20,   # 20% - image sharpness
             'watermark': 0.05,   # 5% - watermark penalty
         }
+        
+        # Thread pool for assess_batch, created on first use
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # Pixel analysis results keyed by (path, mtime_ns, size), least
+        # recently used first; the lock guards it across pool threads
+        self._pixel_cache: 'OrderedDict[Tuple[str, int, int], Tuple[float, bool, float]]' = OrderedDict()
+        self._pixel_cache_lock = threading.Lock()
     
     def assess_image_quality(self, hash_result: ImageHashResult) -> QualityScore:
         """
@@ -77,28 +193,14 @@ class QualityAssessor:
         size_score = self._assess_size_quality(hash_result.file_size, hash_result.format)
         
         # Advanced assessments requiring image loading
-        try:
-            with Image.open(hash_result.file_path) as img:
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                sharpness_score = self._assess_sharpness(img)
-                has_watermark, watermark_confidence = self._detect_watermark(img)
-        except:
-            sharpness_score = 50.0  # Neutral score if can't analyze
-            has_watermark = False
-            watermark_confidence = 0.0
+        sharpness_score, has_watermark, watermark_confidence = self._assess_result_pixels(hash_result)
         
         # Apply watermark penalty
         watermark_penalty = watermark_confidence if has_watermark else 0.0
         
         # Calculate overall weighted score
-        overall_score = (
-            format_score * self.score_weights['format'] +
-            resolution_score * self.score_weights['resolution'] +
-            size_score * self.score_weights['size'] +
-            sharpness_score * self.score_weights['sharpness'] -
-            watermark_penalty * self.score_weights['watermark'] * 100  # Convert to penalty
-        )
+        overall_score = self._overall_score(format_score, resolution_score, size_score,
+                                            sharpness_score, watermark_penalty)
         
         return QualityScore(
             file_path=hash_result.file_path,
@@ -111,6 +213,106 @@ class QualityAssessor:
             watermark_confidence=watermark_confidence
         )
     
+    def assess_batch(self, hash_results: List[ImageHashResult]) -> List[QualityScore]:
+        """
+        Assess the quality of many images at once.
+        
+        Gives the same scores as assess_image_quality, but the metadata
+        scores are computed as arrays over the whole batch and the pixel
+        analyses run on the thread pool.
+        
+        Args:
+            hash_results: List of image hash results with metadata
+            
+        Returns:
+            List of QualityScore objects in the same order as hash_results
+        """
+        n = len(hash_results)
+        format_scores, resolution_scores, size_scores, failed = self._metadata_scores(hash_results)
+        
+        # Only the pixel analyses need the image itself
+        to_analyze = [r for r, error in zip(hash_results, failed) if not error]
+        if len(to_analyze) > 1:
+            # Decoding and pixel analysis release the GIL, so threads overlap
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+            pixel_results = self._executor.map(self._assess_result_pixels, to_analyze)
+        else:
+            pixel_results = map(self._assess_result_pixels, to_analyze)
+        
+        sharpness_scores = np.zeros(n)
+        has_watermarks = np.zeros(n, dtype=bool)
+        watermark_confidences = np.zeros(n)
+        opened = np.flatnonzero(~failed)
+        for i, (sharpness, has_watermark, confidence) in zip(opened, pixel_results):
+            sharpness_scores[i] = sharpness
+            has_watermarks[i] = has_watermark
+            watermark_confidences[i] = confidence
+        
+        watermark_penalties = np.where(has_watermarks, watermark_confidences, 0.0)
+        overall_scores = np.maximum(0.0, self._overall_score(
+            format_scores, resolution_scores, size_scores, sharpness_scores, watermark_penalties
+        ))
+        
+        return [
+            QualityScore(
+                file_path=result.file_path,
+                overall_score=overall,
+                format_score=format_score,
+                resolution_score=resolution,
+                size_score=size_score,
+                sharpness_score=sharpness,
+                has_watermark=has_watermark,
+                watermark_confidence=confidence
+            )
+            for result, overall, format_score, resolution, size_score, sharpness, has_watermark, confidence
+            in zip(hash_results, overall_scores.tolist(), format_scores.tolist(),
+                   resolution_scores.tolist(), size_scores.tolist(), sharpness_scores.tolist(),
+                   has_watermarks.tolist(), watermark_confidences.tolist())
+        ]
+    
+    def _metadata_scores(self, hash_results: List[ImageHashResult]
+                         ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute the scores that only need hash result metadata, as arrays.
+        
+        Returns:
+            Tuple of (format_scores, resolution_scores, size_scores, failed);
+            failed marks results with an error, whose scores are all zero
+        """
+        n = len(hash_results)
+        
+        # Map each distinct format to a small index into lookup arrays
+        format_codes: Dict[str, int] = {}
+        format_idx = np.fromiter(
+            (format_codes.setdefault((r.format or '').upper(), len(format_codes)) for r in hash_results),
+            dtype=np.intp, count=n
+        )
+        format_weights = np.array([self.format_weights.get(f, 30) for f in format_codes], dtype=np.float64)
+        format_multipliers = np.array([self.format_multipliers.get(f, 1.0) for f in format_codes],
+                                      dtype=np.float64)
+        
+        widths = np.fromiter((r.image_width for r in hash_results), dtype=np.int64, count=n)
+        heights = np.fromiter((r.image_height for r in hash_results), dtype=np.int64, count=n)
+        sizes = np.fromiter((r.file_size for r in hash_results), dtype=np.int64, count=n)
+        
+        format_scores = format_weights[format_idx]
+        
+        total_pixels = widths * heights
+        resolution_scores = np.minimum(100.0, np.log10(np.maximum(total_pixels, 1)) * self.RESOLUTION_LOG_SCALE)
+        resolution_scores[(widths <= 0) | (heights <= 0) | (total_pixels <= 1)] = 0.0
+        
+        size_scores = np.log10(np.maximum(sizes, 1)) * self.SIZE_LOG_SCALE
+        size_scores = np.minimum(100.0, size_scores * format_multipliers[format_idx])
+        size_scores[sizes <= 0] = 0.0
+        
+        # Failed images score zero everywhere, as in assess_image_quality
+        failed = np.fromiter((bool(r.error) for r in hash_results), dtype=bool, count=n)
+        for scores in (format_scores, resolution_scores, size_scores):
+            scores[failed] = 0.0
+        
+        return format_scores, resolution_scores, size_scores, failed
+    
     def compare_images(self, images: List[ImageHashResult]) -> ImageHashResult:
         """
         Compare multiple images and return the highest quality one.
@@ -124,20 +326,125 @@ class QualityAssessor:
         if len(images) == 1:
             return images[0]
         
-        scores = [self.assess_image_quality(img) for img in images]
+        # Sharpness adds at most 20 points and the watermark penalty takes
+        # at most 5, so the metadata scores alone bound each overall score.
+        # Images whose best case loses to another's worst case can't win
+        # and skip the pixel analyses.
+        format_scores, resolution_scores, size_scores, failed = self._metadata_scores(images)
+        lowest = np.maximum(0.0, self._overall_score(format_scores, resolution_scores, size_scores, 0.0, 1.0))
+        highest = self._overall_score(format_scores, resolution_scores, size_scores, 100.0, 0.0)
+        highest[failed] = 0.0
+        candidates = [images[i] for i in np.flatnonzero(highest >= lowest.max())]
+        
+        scores = self.assess_batch(candidates)
         best_score = max(scores, key=lambda s: s.overall_score)
         
-        # Find the corresponding ImageHashResult
+        # Find the corresponding ImageHashResult (first one if paths repeat)
+        by_path = {}
         for img in images:
-            if img.file_path == best_score.file_path:
-                return img
+            by_path.setdefault(img.file_path, img)
         
         # Fallback to first image if something went wrong
-        return images[0]
+        return by_path.get(best_score.file_path, images[0])
+    
+    def close(self) -> None:
+        """
+        Shut down the assess_batch thread pool, if one was started.
+        
+        The assessor stays usable; a later assess_batch starts a new pool.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _assess_result_pixels(self, hash_result: ImageHashResult) -> Tuple[float, bool, float]:
+        """
+        Run the pixel analyses for a hash result.
+        
+        Uses the grayscale thumbnail the hash stage kept, if any, instead
+        of decoding the file again.
+        
+        Returns:
+            Tuple of (sharpness_score, has_watermark, watermark_confidence)
+        """
+        thumbnail = hash_result.gray_thumbnail
+        if thumbnail is None:
+            return self._assess_pixels(hash_result.file_path)
+        
+        gray = thumbnail
+        if max(gray.shape) > ANALYSIS_MAX_SIZE:
+            gray = gray_thumbnail(Image.fromarray(gray), ANALYSIS_MAX_SIZE)
+        has_watermark, watermark_confidence = self._detect_watermark(gray)
+        return self._assess_sharpness(gray), has_watermark, watermark_confidence
+    
+    def _assess_pixels(self, image_path: Path) -> Tuple[float, bool, float]:
+        """
+        Run the analyses that need the decoded image.
+        
+        Results are remembered by path, mtime and size, so a file that
+        hasn't changed since it was last assessed isn't decoded again.
+        
+        Returns:
+            Tuple of (sharpness_score, has_watermark, watermark_confidence),
+            with neutral values if the image can't be analyzed
+        """
+        try:
+            with open(image_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+                with self._pixel_cache_lock:
+                    cached = self._pixel_cache.get(key)
+                    if cached is not None:
+                        self._pixel_cache.move_to_end(key)
+                        return cached
+                
+                gray = self._load_gray(f)
+            sharpness_score = self._assess_sharpness(gray)
+            has_watermark, watermark_confidence = self._detect_watermark(gray)
+        except:
+            return 50.0, False, 0.0  # Neutral scores if can't analyze
+        
+        result = (sharpness_score, has_watermark, watermark_confidence)
+        with self._pixel_cache_lock:
+            self._pixel_cache[key] = result
+            if len(self._pixel_cache) > self.PIXEL_CACHE_SIZE:
+                self._pixel_cache.popitem(last=False)
+        return result
+    
+    def _load_gray(self, image_file) -> np.ndarray:
+        """Decode an image file into the grayscale analysis array."""
+        with Image.open(image_file) as img:
+            # Let JPEG decode straight to grayscale, at a reduced scale
+            # that still covers the analysis size; other formats ignore
+            # the hint
+            img.draft('L', (ANALYSIS_MAX_SIZE, ANALYSIS_MAX_SIZE))
+            # Both analyses share one downscaled grayscale array
+            return _prepare_gray(img)
+    
+    def _overall_score(self, format_score, resolution_score, size_score,
+                       sharpness_score, watermark_penalty):
+        """Combine aspect scores (floats or arrays) into the weighted overall score."""
+        return (
+            format_score * self.score_weights['format'] +
+            resolution_score * self.score_weights['resolution'] +
+            size_score * self.score_weights['size'] +
+            sharpness_score * self.score_weights['sharpness'] -
+            watermark_penalty * self.score_weights['watermark'] * 100  # Convert to penalty
+        )
     
     def _assess_format_quality(self, format_name: str) -> float:
         """Assess quality based on image format."""
-        return self.format_weights.get(format_name.upper(), 30)  # Default for unknown formats
+        # PIL's format names are already uppercase, so try them as-is first
+        weight = self.format_weights.get(format_name)
+        if weight is None:
+            weight = self.format_weights.get(format_name.upper(), 30)  # Default for unknown formats
+        return weight
     
     def _assess_resolution_quality(self, width: int, height: int) -> float:
         """
@@ -156,10 +463,9 @@ class QualityAssessor:
         if total_pixels <= 1:
             return 0.0
         
-        log_pixels = math.log10(total_pixels)
         # Normalize: assume 100MP (log10(100M) ≈ 8) as maximum for scoring
-        normalized_score = (log_pixels / 8.0) * 100
-        return min(100.0, normalized_score)
+        normalized_score = math.log10(total_pixels) * self.RESOLUTION_LOG_SCALE
+        return normalized_score if normalized_score < 100.0 else 100.0
     
     def _assess_size_quality(self, file_size: int, format_name: str) -> float:
         """
@@ -171,59 +477,30 @@ class QualityAssessor:
         if file_size <= 0:
             return 0.0
         
-        # Different formats have different size expectations
-        format_multipliers = {
-            'PSD': 1.0,    # PSD files are naturally large
-            'PNG': 1.2,    # PNG can be large due to lossless compression
-            'TIFF': 1.0,   # Similar to PSD
-            'TIF': 1.0,
-            'BMP': 0.8,    # BMP is large but not necessarily high quality
-            'WEBP': 1.5,   # WebP is efficient, smaller files can be high quality
-            'JPG': 2.0,    # JPG compression means size matters more
-            'JPEG': 2.0,
-            'GIF': 1.0,    # GIF has limited colors anyway
-        }
-        
-        multiplier = format_multipliers.get(format_name.upper(), 1.0)
+        multiplier = self.format_multipliers.get(format_name)
+        if multiplier is None:
+            multiplier = self.format_multipliers.get(format_name.upper(), 1.0)
         
         # Logarithmic scale for file size (in bytes)
         # 1KB = ~6 points, 100KB = ~10 points, 1MB = ~12 points, 10MB = ~16 points, 100MB = ~20 points
-        log_size = math.log10(max(1, file_size))
         # Use log10(100MB) = 8 as reasonable maximum, but don't cap at 100%
-        base_score = (log_size / 10.0) * 100  # More reasonable scaling
-        final_score = base_score * multiplier
-        return min(100.0, final_score)
+        final_score = math.log10(file_size) * self.SIZE_LOG_SCALE * multiplier
+        return final_score if final_score < 100.0 else 100.0
     
-    def _assess_sharpness(self, img: Image.Image) -> float:
+    def _assess_sharpness(self, img: Union[Image.Image, np.ndarray]) -> float:
         """
         Assess image sharpness using Laplacian variance.
         
         Higher variance indicates more edges/details, suggesting sharper image.
+        
+        Args:
+            img: PIL image, or a grayscale array from _prepare_gray
         """
         try:
-            # Convert to grayscale for sharpness analysis
-            gray_img = img.convert('L')
-            
-            # Resize if image is very large to speed up processing
-            if max(gray_img.size) > 1000:
-                ratio = 1000 / max(gray_img.size)
-                new_size = (int(gray_img.width * ratio), int(gray_img.height * ratio))
-                gray_img = gray_img.resize(new_size, Image.LANCZOS)
-            
-            # Convert to numpy array
-            img_array = np.array(gray_img)
+            gray = _prepare_gray(img) if isinstance(img, Image.Image) else img
             
-            # Apply Laplacian filter to detect edges
-            # Simple approximation of Laplacian: center - average of neighbors
-            laplacian = np.zeros_like(img_array, dtype=np.float64)
-            laplacian[1:-1, 1:-1] = (
-                4 * img_array[1:-1, 1:-1] - 
-                img_array[0:-2, 1:-1] - img_array[2:, 1:-1] - 
-                img_array[1:-1, 0:-2] - img_array[1:-1, 2:]
-            )
-            
-            # Calculate variance of Laplacian
-            variance = np.var(laplacian)
+            # Calculate variance of the Laplacian, which responds to edges
+            variance = _laplacian_variance(gray)
             
             # Normalize to 0-100 scale
             # Based on empirical testing, variance around 1000 is quite sharp
@@ -233,7 +510,7 @@ class QualityAssessor:
         except Exception:
             return 50.0  # Neutral score if analysis fails
     
-    def _detect_watermark(self, img: Image.Image) -> tuple[bool, float]:
+    def _detect_watermark(self, img: Union[Image.Image, np.ndarray]) -> tuple[bool, float]:
         """
         Simple watermark detection in image corners.
         
@@ -241,13 +518,15 @@ class QualityAssessor:
         This is a basic implementation - more sophisticated detection would
         use machine learning or template matching.
         
+        Args:
+            img: PIL image, or a grayscale array from _prepare_gray
+        
         Returns:
             Tuple of (has_watermark, confidence)
         """
         try:
-            # Convert to grayscale for analysis
-            gray_img = img.convert('L')
-            width, height = gray_img.size
+            gray = _prepare_gray(img) if isinstance(img, Image.Image) else img
+            height, width = gray.shape
             
             # Define corner regions (10% of image size in each corner)
             corner_size_x = int(width * 0.1)
@@ -256,33 +535,24 @@ class QualityAssessor:
             if corner_size_x < 10 or corner_size_y < 10:
                 return False, 0.0  # Image too small to analyze
             
-            # Extract corner regions
-            corners = [
-                gray_img.crop((0, 0, corner_size_x, corner_size_y)),                    # Top-left
-                gray_img.crop((width-corner_size_x, 0, width, corner_size_y)),          # Top-right
-                gray_img.crop((0, height-corner_size_y, corner_size_x, height)),        # Bottom-left
-                gray_img.crop((width-corner_size_x, height-corner_size_y, width, height)) # Bottom-right
-            ]
-            
-            watermark_indicators = 0
+            # Extract corner regions; all four have the same shape
+            corners = np.stack([
+                gray[:corner_size_y, :corner_size_x],                   # Top-left
+                gray[:corner_size_y, width-corner_size_x:],             # Top-right
+                gray[height-corner_size_y:, :corner_size_x],            # Bottom-left
+                gray[height-corner_size_y:, width-corner_size_x:]       # Bottom-right
+            ])
             total_corners = len(corners)
             
-            for corner in corners:
-                corner_array = np.array(corner)
-                
-                # Look for signs of watermarks:
-                # 1. High contrast text/logos (high edge density)
-                # 2. Consistent patterns (low variance might indicate overlay)
-                
-                # Calculate edge density using simple gradient
-                if corner_array.shape[0] > 1 and corner_array.shape[1] > 1:
-                    grad_x = np.abs(np.diff(corner_array, axis=1))
-                    grad_y = np.abs(np.diff(corner_array, axis=0))
-                    edge_density = (np.mean(grad_x) + np.mean(grad_y)) / 2
-                    
-                    # High edge density might indicate text/logos
-                    if edge_density > 15:  # Threshold based on empirical testing
-                        watermark_indicators += 1
+            # Look for signs of watermarks:
+            # 1. High contrast text/logos (high edge density)
+            # 2. Consistent patterns (low variance might indicate overlay)
+            
+            # Calculate edge density using simple gradient; high edge
+            # density might indicate text/logos
+            edge_densities = _edge_densities(corners)
+            # Threshold based on empirical testing
+            watermark_indicators = int(np.count_nonzero(edge_densities > 15))
             
             # Calculate confidence based on how many corners show watermark signs
             confidence = watermark_indicators / total_corners
@@ -304,8 +574,8 @@ def assess_image_quality(hash_result: ImageHashResult) -> QualityScore:
     Returns:
         QualityScore object
     """
-    assessor = QualityAssessor()
-    return assessor.assess_image_quality(hash_result)
+    with QualityAssessor() as assessor:
+        return assessor.assess_image_quality(hash_result)
 
 
 if __name__ == "__main__":
@@ -331,20 +601,19 @@ if __name__ == "__main__":
         hash_results = generate_image_hashes(images[:5])  # Test first 5
         
         print("Assessing image quality...")
-        assessor = QualityAssessor()
-        
-        for hash_result in hash_results:
-            if not hash_result.error:
-                quality = assessor.assess_image_quality(hash_result)
-                print(f"\n{quality.file_path.name}:")
-                print(f"  Overall Score: {quality.overall_score:.1f}")
-                print(f"  Format: {quality.format_score:.1f}")
-                print(f"  Resolution: {quality.resolution_score:.1f}")
-                print(f"  Size: {quality.size_score:.1f}")
-                print(f"  Sharpness: {quality.sharpness_score:.1f}")
-                print(f"  Watermark: {quality.has_watermark} (confidence: {quality.watermark_confidence:.2f})")
-            else:
-                print(f"\nERROR - {hash_result.file_path.name}: {hash_result.error}")
+        with QualityAssessor() as assessor:
+            for hash_result in hash_results:
+                if not hash_result.error:
+                    quality = assessor.assess_image_quality(hash_result)
+                    print(f"\n{quality.file_path.name}:")
+                    print(f"  Overall Score: {quality.overall_score:.1f}")
+                    print(f"  Format: {quality.format_score:.1f}")
+                    print(f"  Resolution: {quality.resolution_score:.1f}")
+                    print(f"  Size: {quality.size_score:.1f}")
+                    print(f"  Sharpness: {quality.sharpness_score:.1f}")
+                    print(f"  Watermark: {quality.has_watermark} (confidence: {quality.watermark_confidence:.2f})")
+                else:
+                    print(f"\nERROR - {hash_result.file_path.name}: {hash_result.error}")
         
     except Exception as e:
         print(f"Error: {e}")
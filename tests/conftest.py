@@ -1,6 +1,7 @@
 """
 Pytest configuration and fixtures for image deduplication tests.
 """
+import os
 import pytest
 import tempfile
 import shutil
@@ -9,23 +10,58 @@ from PIL import Image
 import numpy as np
 from typing import List
 
+from hash_generator import HashGenerator
+
+
+# Keep test files in RAM where tmpfs is available, unless TMPDIR says otherwise
+TEMP_ROOT = None
+if 'TMPDIR' not in os.environ and os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+    TEMP_ROOT = '/dev/shm'
+
 
 @pytest.fixture
 def temp_dir():
     """Create a temporary directory for testing."""
-    temp_path = tempfile.mkdtemp()
+    temp_path = tempfile.mkdtemp(dir=TEMP_ROOT)
     yield Path(temp_path)
     shutil.rmtree(temp_path)
 
 
+@pytest.fixture(scope="session")
+def sample_images_source(tmp_path_factory):
+    """Encode the sample test images once per test run."""
+    root = tmp_path_factory.getbasetemp()
+    if os.environ.get('PYTEST_XDIST_WORKER'):
+        root = root.parent  # Shared by every pytest-xdist worker of this run
+    
+    images_dir = root / "sample_images"
+    if not images_dir.is_dir():
+        # Build aside and rename into place, so workers racing here never
+        # see a half-written set; the first rename wins
+        staging = Path(tempfile.mkdtemp(dir=root))
+        create_test_images(staging)
+        try:
+            os.rename(staging, images_dir)
+        except OSError:
+            shutil.rmtree(staging)
+    
+    return images_dir
+
+
+@pytest.fixture(scope="session")
+def sample_jpg_hash(sample_images_source):
+    """Hash one sample JPEG once per test run, for tests that only read it."""
+    image_path = next(sample_images_source.glob("*.jpg"))
+    return image_path, HashGenerator().generate_hash(image_path)
+
+
 @pytest.fixture
-def sample_images_dir(temp_dir):
+def sample_images_dir(temp_dir, sample_images_source):
     """Create a directory with sample test images."""
+    # Tests may add, change or delete files, so each gets its own copy;
+    # plain copies also give the files fresh mtimes, as a rebuild would
     images_dir = temp_dir / "test_images"
-    images_dir.mkdir()
-    
-    # Create various test images
-    create_test_images(images_dir)
+    shutil.copytree(sample_images_source, images_dir, copy_function=shutil.copy)
     
     return images_dir
 
@@ -63,8 +99,7 @@ def create_test_images(images_dir: Path) -> None:
     
     # Image 5: Green gradient (different content)
     img3_array = np.zeros((100, 100, 3), dtype=np.uint8)
-    for i in range(100):
-        img3_array[:, i, 1] = int((i / 100) * 255)  # Green gradient
+    img3_array[:, :, 1] = (np.arange(100) / 100 * 255).astype(np.uint8)  # Green gradient
     img3 = Image.fromarray(img3_array)
     img3.save(images_dir / "green_gradient.png", "PNG")
     
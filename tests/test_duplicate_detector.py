@@ -1,10 +1,11 @@
 """
 Unit tests for duplicate_detector.py
 """
+import itertools
 import pytest
 from pathlib import Path
 from duplicate_detector import DuplicateDetector, DuplicateGroup, detect_duplicates
-from hash_generator import ImageHashResult, HashGenerator
+from hash_generator import ImageHashResult, ImageHashTable, HashGenerator
 
 
 class TestDuplicateDetector:
@@ -70,7 +71,7 @@ class TestDuplicateDetector:
         generator = HashGenerator()
         
         # Get a few different images
-        image_paths = list(sample_images_dir.glob("*.jpg"))[:3]
+        image_paths = list(itertools.islice(sample_images_dir.glob("*.jpg"), 3))
         hash_results = generator.generate_hashes(image_paths, show_progress=False)
         valid_results = [r for r in hash_results if not r.error]
         
@@ -80,6 +81,79 @@ class TestDuplicateDetector:
         # Our test images are different enough that we shouldn't find exact matches
         assert len(duplicates) == 0
     
+    @pytest.mark.parametrize("threshold,agreement", [(0, 2), (3, 1), (10, 2), (10, 3)])
+    def test_find_duplicates_matches_full_scan(self, threshold, agreement):
+        """Test that candidate bucketing groups exactly like a full pairwise scan."""
+        import random
+        rng = random.Random(threshold * 10 + agreement)
+        
+        # Clusters of near-identical hashes plus unrelated noise
+        results = []
+        for n in range(60):
+            base = [rng.getrandbits(64) for _ in range(3)]
+            if n % 3 and results:
+                base = [int(getattr(results[-1], alg), 16) for alg in DuplicateDetector.HASH_ALGORITHMS]
+                base = [h ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for h in base]
+            results.append(ImageHashResult(
+                file_path=Path(f"img{n}.jpg"), ahash=f"{base[0]:016x}",
+                dhash=f"{base[1]:016x}", phash=f"{base[2]:016x}",
+                file_size=1000 + n, image_width=10, image_height=10, format="JPEG"
+            ))
+        
+        detector = DuplicateDetector(similarity_threshold=threshold, require_agreement=agreement)
+        generator = HashGenerator()
+        
+        # Reference greedy grouping over every pair
+        expected, assigned = [], set()
+        for i, result1 in enumerate(results):
+            if i in assigned:
+                continue
+            group = [i]
+            for j in range(i + 1, len(results)):
+                if j not in assigned and generator.get_consensus_similarity(
+                        result1, results[j], threshold, agreement):
+                    group.append(j)
+                    assigned.add(j)
+            if len(group) > 1:
+                expected.append(sorted(str(results[k].file_path) for k in group))
+        
+        groups = detector.find_duplicates(results, show_progress=False)
+        actual = [sorted(str(img.file_path) for img in g.images) for g in groups]
+        
+        assert sorted(actual) == sorted(expected)
+        
+        # Incremental grouping must agree with the batch result
+        streamed = detector.find_duplicates_streaming(iter(results), show_progress=False)
+        assert streamed == groups
+        
+        # So must the columnar input
+        table = ImageHashTable.from_results(results)
+        assert detector.find_duplicates(table, show_progress=False) == groups
+    
+    @pytest.mark.parametrize("bits,threshold", [(64, 30), (256, 124)])
+    def test_consensus_batch_matches_scalar(self, bits, threshold):
+        """Test vectorized consensus against per-pair checks."""
+        import random
+        import numpy as np
+        rng = random.Random(16)
+        width = bits // 4
+        
+        results = [ImageHashResult(
+            file_path=Path(f"img{n}.png"), ahash=f"{rng.getrandbits(bits):0{width}x}",
+            dhash=f"{rng.getrandbits(bits):0{width}x}", phash=f"{rng.getrandbits(bits):0{width}x}",
+            file_size=1000, image_width=10, image_height=10, format="PNG"
+        ) for n in range(30)]
+        
+        detector = DuplicateDetector(similarity_threshold=threshold, require_agreement=2)
+        generator = HashGenerator()
+        packed = detector._pack_hashes(results)
+        mask = detector._consensus_batch(packed, 0, np.arange(1, len(results)))
+        
+        expected = [generator.get_consensus_similarity(results[0], r, threshold, 2)
+                    for r in results[1:]]
+        assert any(expected) and not all(expected)
+        assert mask.tolist() == expected
+    
     def test_select_best_image_single(self, sample_images_dir):
         """Test selecting best image with single option."""
         detector = DuplicateDetector()
@@ -137,6 +211,17 @@ class TestDuplicateDetector:
         best = detector._select_best_image([small_result, large_result])
         assert best.image_width == 200 and best.image_height == 200
     
+    def test_select_best_image_ties_keep_first(self):
+        """Test that fully tied images resolve to the earliest one."""
+        detector = DuplicateDetector()
+        
+        results = [ImageHashResult(
+            file_path=Path(f"img{n}.png"), ahash="0" * 16, dhash="0" * 16, phash="0" * 16,
+            file_size=size, image_width=10, image_height=10, format="PNG"
+        ) for n, size in enumerate([500, 900, 900])]
+        
+        assert detector._select_best_image(results) is results[1]
+    
     def test_get_statistics_empty(self):
         """Test statistics with empty duplicate groups."""
         detector = DuplicateDetector()
@@ -181,6 +266,22 @@ class TestDuplicateDetector:
         assert stats['average_group_size'] == 3.0
         assert stats['total_size_saved'] > 0  # Should save some space
     
+    def test_merge_exact_duplicates(self, sample_images_dir):
+        """Test that byte-identical copies are folded into duplicate groups."""
+        detector = DuplicateDetector()
+        generator = HashGenerator()
+        
+        results = generator.generate_hashes(sorted(sample_images_dir.glob("*.png")), show_progress=False)
+        source = results[0]
+        copies = [Path("copy1.png"), Path("copy2.png")]
+        
+        groups = detector.merge_exact_duplicates([], results, {source.file_path: copies})
+        
+        assert len(groups) == 1
+        assert groups[0].representative == source
+        assert [img.file_path for img in groups[0].images] == [source.file_path] + copies
+        assert all(img.phash == source.phash for img in groups[0].images)
+    
     def test_print_duplicate_report(self, capsys, temp_dir):
         """Test that duplicate report prints without errors."""
         detector = DuplicateDetector()
@@ -259,7 +360,7 @@ class TestDetectDuplicatesFunction:
     def test_detect_duplicates_function(self, sample_images_dir):
         """Test detect_duplicates convenience function."""
         generator = HashGenerator()
-        image_paths = list(sample_images_dir.glob("*.jpg"))[:3]
+        image_paths = list(itertools.islice(sample_images_dir.glob("*.jpg"), 3))
         hash_results = generator.generate_hashes(image_paths, show_progress=False)
         
         duplicates = detect_duplicates(hash_results, similarity_threshold=15, require_agreement=1)
@@ -6,7 +6,8 @@ import json
 from pathlib import Path
 from PIL import Image
 from file_organizer import (
-    FileOrganizer, CopyResult, OrganizationReport, organize_images
+    FileOrganizer, CopyResult, OrganizationReport, organize_images,
+    _fast_exact_dedupe, _copy_file, EXACT_DEDUPE_SAMPLE_BYTES
 )
 from duplicate_detector import DuplicateGroup
 from hash_generator import ImageHashResult, HashGenerator
@@ -35,6 +36,11 @@ class TestFileOrganizer:
         assert organizer.preserve_structure is True
         assert organizer.dry_run is True
     
+    def test_init_rejects_unknown_link_mode(self, output_dir):
+        """Test that link_mode must be one of LINK_MODES."""
+        with pytest.raises(ValueError):
+            FileOrganizer(str(output_dir), link_mode="symlink")
+    
     def test_resolve_filename_conflict_no_conflict(self, output_dir):
         """Test filename resolution when no conflict exists."""
         organizer = FileOrganizer(str(output_dir), dry_run=True)
@@ -71,6 +77,33 @@ class TestFileOrganizer:
         # Should get next available increment
         assert resolved.name == "test_3.jpg"
     
+    def test_resolve_filename_conflict_existing_files(self, output_dir):
+        """Test that files already in the output directory are avoided."""
+        organizer = FileOrganizer(str(output_dir), dry_run=False)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / "test.jpg").write_bytes(b"x")
+        (output_dir / "test_1.jpg").write_bytes(b"x")
+        
+        resolved = organizer._resolve_filename_conflict(output_dir / "test.jpg")
+        assert resolved.name == "test_2.jpg"
+        
+        # Directories that don't exist yet have no conflicts
+        missing = output_dir / "new" / "test.jpg"
+        assert organizer._resolve_filename_conflict(missing) == missing
+    
+    def test_resolve_filename_conflict_resumes_counter(self, output_dir):
+        """Test that repeated conflicts keep numbering without skipping or reusing names."""
+        organizer = FileOrganizer(str(output_dir), dry_run=True)
+        
+        names = [organizer._plan_destination(Path("/src") / f"dir{i}" / "test.jpg").name
+                 for i in range(5)]
+        assert names == ["test.jpg", "test_1.jpg", "test_2.jpg", "test_3.jpg", "test_4.jpg"]
+        
+        # Unreserved results are offered again, and outside reservations are skipped
+        assert organizer._resolve_filename_conflict(output_dir / "test.jpg").name == "test_5.jpg"
+        organizer.copied_names.update(["test_5.jpg", "test_6.jpg"])
+        assert organizer._resolve_filename_conflict(output_dir / "test.jpg").name == "test_7.jpg"
+    
     def test_copy_image_dry_run(self, sample_images_dir, output_dir):
         """Test copying image in dry-run mode."""
         organizer = FileOrganizer(str(output_dir), dry_run=True)
@@ -106,9 +139,8 @@ class TestFileOrganizer:
         organizer = FileOrganizer(str(output_dir), preserve_structure=True, dry_run=True)
         
         # Get image from subdirectory
-        subdir_images = list(sample_images_dir.rglob("subdir/*.png"))
-        if subdir_images:
-            source_image = subdir_images[0]
+        source_image = next(sample_images_dir.rglob("subdir/*.png"), None)
+        if source_image:
             result = organizer._copy_image(source_image, sample_images_dir)
             
             assert result.success is True
@@ -120,9 +152,8 @@ class TestFileOrganizer:
         organizer = FileOrganizer(str(output_dir), preserve_structure=False, dry_run=True)
         
         # Get image from subdirectory
-        subdir_images = list(sample_images_dir.rglob("subdir/*.png"))
-        if subdir_images:
-            source_image = subdir_images[0]
+        source_image = next(sample_images_dir.rglob("subdir/*.png"), None)
+        if source_image:
             result = organizer._copy_image(source_image, sample_images_dir)
             
             assert result.success is True
@@ -186,6 +217,43 @@ class TestFileOrganizer:
         assert report.duplicate_groups_found == 1
         assert report.total_space_saved > 0  # Should save space by not copying duplicates
     
+    def test_organize_images_dry_run_uses_known_sizes(self, temp_dir, output_dir):
+        """Test that dry runs report representative sizes from the hash results."""
+        organizer = FileOrganizer(str(output_dir), dry_run=True)
+        
+        # Neither file exists, so their sizes can only come from the hash results
+        hash_results = [
+            ImageHashResult(file_path=temp_dir / f"gone_{i}.jpg", ahash="0" * 16, dhash="0" * 16,
+                            phash="0" * 16, file_size=1000 + i, image_width=10, image_height=10,
+                            format="JPEG")
+            for i in range(2)
+        ]
+        group = DuplicateGroup(images=hash_results, representative=hash_results[1])
+        
+        report = organizer.organize_images([group], [r.file_path for r in hash_results],
+                                           show_progress=False)
+        
+        assert len(report.copy_results) == 1
+        assert report.copy_results[0].bytes_copied == 1001
+        assert report.total_bytes_copied == 1001
+    
+    def test_organize_images_dry_run_uses_hash_results(self, temp_dir, output_dir):
+        """Test that dry runs report sizes of ungrouped images from hash_results."""
+        organizer = FileOrganizer(str(output_dir), dry_run=True)
+        
+        def result(name, size, error=None):
+            return ImageHashResult(file_path=temp_dir / name, ahash="0" * 16, dhash="0" * 16,
+                                   phash="0" * 16, file_size=size, image_width=10,
+                                   image_height=10, format="JPEG", error=error)
+        hash_results = [result("gone.jpg", 500), result("broken.jpg", 0, error="bad")]
+        (temp_dir / "broken.jpg").write_bytes(b"x" * 7)
+        
+        report = organizer.organize_images([], [r.file_path for r in hash_results],
+                                           show_progress=False, hash_results=hash_results)
+        
+        # Failed results carry no size, so that file is still statted
+        assert [r.bytes_copied for r in report.copy_results] == [500, 7]
+    
     def test_organize_images_mixed_scenario(self, temp_dir, output_dir):
         """Test organizing with both unique and duplicate images."""
         organizer = FileOrganizer(str(output_dir), dry_run=True)
@@ -232,6 +300,181 @@ class TestFileOrganizer:
         # Should copy unique blue + representative of red group + any non-grouped images
         assert report.unique_images_copied >= 2
     
+    def test_organize_images_threaded_copies(self, temp_dir, output_dir):
+        """Test that threaded copies keep input order and distinct names."""
+        organizer = FileOrganizer(str(output_dir), copy_workers=4)
+        
+        # Same filename in several directories forces conflict renames
+        all_images = []
+        for i in range(12):
+            path = temp_dir / f"dir{i}" / "photo.jpg"
+            path.parent.mkdir()
+            path.write_bytes(bytes([i]) * (i + 1))
+            all_images.append(path)
+        
+        report = organizer.organize_images([], all_images, show_progress=False)
+        
+        assert [r.source_path for r in report.copy_results] == all_images
+        assert all(r.success for r in report.copy_results)
+        destinations = [r.destination_path for r in report.copy_results]
+        assert len(set(destinations)) == len(all_images)
+        for result in report.copy_results:
+            assert result.destination_path.read_bytes() == result.source_path.read_bytes()
+    
+    def test_organize_images_copies_in_inode_order(self, temp_dir, output_dir, monkeypatch):
+        """Test that copies run in inode order per window but report in input order."""
+        import os
+        organizer = FileOrganizer(str(output_dir), copy_workers=1)
+        organizer.SEQUENTIAL_IO_WINDOW = 4
+        
+        all_images = [temp_dir / f"img{i}.jpg" for i in range(10)]
+        for path in reversed(all_images):
+            path.write_bytes(b"x")
+        inode = {path: os.stat(path).st_ino for path in all_images}
+        
+        copied = []
+        execute_copy = organizer._execute_copy
+        def recording_copy(source_path, *args):
+            copied.append(source_path)
+            return execute_copy(source_path, *args)
+        monkeypatch.setattr(organizer, "_execute_copy", recording_copy)
+        
+        report = organizer.organize_images([], all_images, show_progress=False)
+        
+        windows = [all_images[0:4], all_images[4:8], all_images[8:10]]
+        assert copied == [p for window in windows for p in sorted(window, key=inode.get)]
+        assert [r.source_path for r in report.copy_results] == all_images
+        assert all(r.success for r in report.copy_results)
+    
+    def test_organize_images_hardlinks(self, temp_dir, output_dir, monkeypatch):
+        """Test hard links on one filesystem and copies where linking fails."""
+        import errno
+        import os
+        organizer = FileOrganizer(str(output_dir), link_mode="hardlink")
+        
+        source = temp_dir / "linked.jpg"
+        source.write_bytes(b"image data")
+        report = organizer.organize_images([], [source], show_progress=False)
+        
+        result = report.copy_results[0]
+        assert result.success and result.method == "hardlink"
+        assert result.bytes_copied == 0
+        assert os.path.samefile(result.destination_path, source)
+        
+        def cross_device(src, dst):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        monkeypatch.setattr(os, "link", cross_device)
+        
+        other = temp_dir / "copied.jpg"
+        other.write_bytes(b"other data")
+        result = organizer.organize_images([], [other], show_progress=False).copy_results[0]
+        assert result.success and result.method == "copy"
+        assert result.bytes_copied == len(b"other data")
+        assert not os.path.samefile(result.destination_path, other)
+    
+    def test_incremental_replaces_stale_hardlink(self, temp_dir, output_dir):
+        """Test that refreshing a stale linked copy never writes through to its source."""
+        source = temp_dir / "photo.jpg"
+        source.write_bytes(b"original")
+        FileOrganizer(str(output_dir), incremental=True, link_mode="hardlink").organize_images(
+            [], [source], show_progress=False)
+        
+        # Editing the source in place changes the linked copy's mtime too, so it's stale
+        with open(source, "ab") as f:
+            f.write(b" edited")
+        report = FileOrganizer(str(output_dir), incremental=True).organize_images(
+            [], [source], show_progress=False)
+        
+        assert report.copy_results[0].method == "copy"
+        assert source.read_bytes() == b"original edited"
+        assert (output_dir / "photo.jpg").read_bytes() == b"original edited"
+    
+    def test_organize_images_creates_each_directory_once(self, temp_dir, output_dir, monkeypatch):
+        """Test that preserved subdirectories get one mkdir each, not one per file."""
+        # The source root is taken from the first image's directory
+        all_images = [temp_dir / "src" / "top.jpg"]
+        all_images[0].parent.mkdir()
+        all_images[0].write_bytes(b"x")
+        for sub in ("a", "b"):
+            for i in range(5):
+                path = temp_dir / "src" / sub / f"img{i}.jpg"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(b"x")
+                all_images.append(path)
+        
+        created = []
+        mkdir = Path.mkdir
+        def counting_mkdir(self, *args, **kwargs):
+            created.append(self)
+            return mkdir(self, *args, **kwargs)
+        monkeypatch.setattr(Path, "mkdir", counting_mkdir)
+        
+        # One copy thread, since two can race to create a new directory first
+        organizer = FileOrganizer(str(output_dir), preserve_structure=True, copy_workers=1)
+        report = organizer.organize_images([], all_images, show_progress=False)
+        
+        assert report.unique_images_copied == 11
+        assert sorted(created) == [output_dir, output_dir / "a", output_dir / "b"]
+    
+    def test_organize_images_streams_results(self, temp_dir, output_dir):
+        """Test that streamed results go to NDJSON with only recent ones kept."""
+        organizer = FileOrganizer(str(output_dir))
+        organizer.RECENT_RESULTS = 3
+        
+        all_images = []
+        for i in range(5):
+            path = temp_dir / f"img{i}.jpg"
+            path.write_bytes(b"x" * (i + 1))
+            all_images.append(path)
+        
+        results_path = temp_dir / "results.ndjson"
+        report = organizer.organize_images([], all_images, show_progress=False,
+                                           results_path=results_path)
+        
+        lines = [json.loads(line) for line in results_path.read_text().splitlines()]
+        assert [line['source_path'] for line in lines] == [str(p) for p in all_images]
+        assert [r.source_path for r in report.copy_results] == all_images[-3:]
+        assert report.unique_images_copied == 5
+        assert report.total_bytes_copied == 15
+        
+        report_path = organizer.save_report(report, temp_dir / "report.json")
+        assert json.loads(report_path.read_text())['copy_results_path'] == str(results_path)
+    
+    def test_organize_images_incremental(self, temp_dir, output_dir):
+        """Test that incremental runs skip unchanged copies and redo changed ones."""
+        all_images = []
+        for i in range(3):
+            path = temp_dir / f"image{i}.jpg"
+            path.write_bytes(bytes([i]) * 10)
+            all_images.append(path)
+        
+        first = FileOrganizer(str(output_dir), incremental=True).organize_images(
+            [], all_images, show_progress=False)
+        assert first.total_bytes_copied == 30
+        assert (output_dir / FileOrganizer.MANIFEST_NAME).exists()
+        
+        # Nothing changed: same destinations, nothing copied, no renamed extras
+        second = FileOrganizer(str(output_dir), incremental=True).organize_images(
+            [], all_images, show_progress=False)
+        assert second.unique_images_copied == 3
+        assert second.total_bytes_copied == 0
+        assert ([r.destination_path for r in second.copy_results]
+                == [r.destination_path for r in first.copy_results])
+        
+        # A modified source is copied again over its earlier copy
+        all_images[1].write_bytes(b"changed")
+        third = FileOrganizer(str(output_dir), incremental=True).organize_images(
+            [], all_images, show_progress=False)
+        assert [r.bytes_copied for r in third.copy_results] == [0, 7, 0]
+        assert third.copy_results[1].destination_path == output_dir / "image1.jpg"
+        assert (output_dir / "image1.jpg").read_bytes() == b"changed"
+        
+        # Without the option, everything is copied again under new names
+        fourth = FileOrganizer(str(output_dir)).organize_images(
+            [], all_images, show_progress=False)
+        assert fourth.total_bytes_copied == 27
+        assert fourth.copy_results[0].destination_path.name == "image0_1.jpg"
+    
     def test_save_report_dry_run(self, output_dir):
         """Test saving report in dry-run mode."""
         organizer = FileOrganizer(str(output_dir), dry_run=True)
@@ -285,6 +528,29 @@ class TestFileOrganizer:
         assert len(data['errors']) == 1
         assert data['errors'][0] == "Test error"
     
+    def test_save_report_copy_results(self, output_dir):
+        """Test that streamed copy results are written as a JSON list."""
+        organizer = FileOrganizer(str(output_dir), dry_run=False)
+        copy_results = [
+            CopyResult(Path("a.jpg"), output_dir / "a.jpg", True, bytes_copied=10),
+            CopyResult(Path("b.jpg"), Path(), False, error="Permission denied")
+        ]
+        report = OrganizationReport(
+            total_input_images=2,
+            unique_images_copied=1,
+            duplicate_groups_found=0,
+            total_space_saved=0,
+            copy_results=copy_results,
+            errors=["Failed to copy b.jpg: Permission denied"],
+            timestamp="2024-01-01T00:00:00"
+        )
+        
+        report_path = organizer.save_report(report)
+        data = json.loads(report_path.read_text())
+        
+        assert data['copy_results'] == [organizer._copy_result_to_dict(r) for r in copy_results]
+        assert data['errors'] == report.errors
+    
     def test_print_report(self, capsys, output_dir):
         """Test printing report to stdout."""
         organizer = FileOrganizer(str(output_dir), dry_run=True)
@@ -419,6 +685,182 @@ class TestOrganizationReport:
         assert "missing.jpg" in report.errors[0]
 
 
+class TestFastExactDedupe:
+    """Test the byte-identical prefilter."""
+    
+    def test_identical_files_collapse(self, temp_dir):
+        """Test that exact copies map to the first occurrence."""
+        paths = []
+        for name, content in [("a.jpg", b"one"), ("b.jpg", b"two"), ("c.jpg", b"one"), ("d.jpg", b"one")]:
+            path = temp_dir / name
+            path.write_bytes(content)
+            paths.append(path)
+        
+        representatives, exact_duplicates = _fast_exact_dedupe(paths)
+        
+        assert representatives == [paths[0], paths[1]]
+        assert exact_duplicates == {paths[0]: [paths[2], paths[3]]}
+    
+    @pytest.mark.parametrize("use_xxhash", [True, False])
+    def test_same_size_different_content(self, temp_dir, monkeypatch, use_xxhash):
+        """Test that files differing only outside the sampled ends are kept apart."""
+        import file_organizer
+        if not use_xxhash:
+            monkeypatch.setattr(file_organizer, "xxhash", None)
+        elif file_organizer.xxhash is None:
+            pytest.skip("xxhash not installed")
+        
+        size = 4 * EXACT_DEDUPE_SAMPLE_BYTES
+        content = bytearray(size)
+        
+        first = temp_dir / "first.bmp"
+        first.write_bytes(bytes(content))
+        content[size // 2] = 1  # Change a byte in the middle only
+        second = temp_dir / "second.bmp"
+        second.write_bytes(bytes(content))
+        
+        representatives, exact_duplicates = _fast_exact_dedupe([first, second])
+        
+        assert representatives == [first, second]
+        assert exact_duplicates == {}
+    
+    @pytest.mark.parametrize("use_blake3", [True, False])
+    def test_large_files_confirmed_in_full(self, temp_dir, monkeypatch, use_blake3):
+        """Test full-file confirmation with and without the optional blake3."""
+        import file_organizer
+        if not use_blake3:
+            monkeypatch.setattr(file_organizer, "blake3", None)
+        elif file_organizer.blake3 is None:
+            pytest.skip("blake3 not installed")
+        
+        content = bytearray(2 * file_organizer.BLAKE3_MMAP_MIN_BYTES)
+        paths = [temp_dir / f"{name}.tif" for name in ("a", "b", "c")]
+        paths[0].write_bytes(bytes(content))
+        paths[1].write_bytes(bytes(content))
+        content[len(content) // 2] = 1
+        paths[2].write_bytes(bytes(content))
+        
+        representatives, exact_duplicates = _fast_exact_dedupe(paths)
+        
+        assert representatives == [paths[0], paths[2]]
+        assert exact_duplicates == {paths[0]: [paths[1]]}
+    
+    def test_missing_files_are_kept(self, temp_dir):
+        """Test that unreadable paths pass through as representatives."""
+        missing = temp_dir / "missing.jpg"
+        
+        representatives, exact_duplicates = _fast_exact_dedupe([missing])
+        
+        assert representatives == [missing]
+        assert exact_duplicates == {}
+
+
+class TestCopyFile:
+    """Test the kernel-assisted file copy."""
+    
+    @pytest.mark.parametrize("kernel_copy", [True, False])
+    def test_copy_file_matches_copy2(self, temp_dir, monkeypatch, kernel_copy):
+        """Test contents, size and timestamps with and without the kernel path."""
+        import os
+        import file_organizer
+        if not kernel_copy:
+            monkeypatch.setattr(file_organizer, "_kernel_copy", lambda src_fd, dst_fd, size: False)
+        
+        source = temp_dir / "source.jpg"
+        source.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+        os.utime(source, ns=(1_500_000_000_000_000_000, 1_500_000_000_000_000_000))
+        dest = temp_dir / "dest.jpg"
+        
+        assert _copy_file(source, dest) == source.stat().st_size
+        assert dest.read_bytes() == source.read_bytes()
+        assert dest.stat().st_mtime_ns == source.stat().st_mtime_ns
+    
+    def test_copy_file_range_failure_falls_back(self, temp_dir, monkeypatch):
+        """Test that an unsupported copy_file_range still copies the file."""
+        import errno
+        import os
+        import file_organizer
+        
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        
+        monkeypatch.setattr(file_organizer, "fcntl", None)
+        monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+        
+        source = temp_dir / "source.png"
+        source.write_bytes(b"png data" * 1000)
+        dest = temp_dir / "dest.png"
+        
+        assert _copy_file(source, dest) == 8000
+        assert dest.read_bytes() == source.read_bytes()
+    
+    def test_copy_file_range_copying_nothing_falls_back(self, temp_dir, monkeypatch):
+        """Test that a copy_file_range reporting end of file at once isn't taken as a copy."""
+        import os
+        import file_organizer
+        
+        monkeypatch.setattr(file_organizer, "fcntl", None)
+        monkeypatch.setattr(os, "copy_file_range", lambda *args: 0, raising=False)
+        monkeypatch.setattr(os, "sendfile", lambda *args: 0, raising=False)
+        
+        source = temp_dir / "source.png"
+        source.write_bytes(b"png data" * 1000)
+        dest = temp_dir / "dest.png"
+        
+        assert _copy_file(source, dest) == 8000
+        assert dest.read_bytes() == source.read_bytes()
+    
+    def test_reflink_ioctl_only_on_linux(self, temp_dir, monkeypatch):
+        """Test that the Linux FICLONE request isn't sent on other platforms."""
+        import sys
+        import file_organizer
+        
+        ioctl_calls = []
+        
+        class FakeFcntl:
+            @staticmethod
+            def ioctl(*args):
+                ioctl_calls.append(args)
+                raise OSError("not supported")
+        
+        monkeypatch.setattr(file_organizer, "fcntl", FakeFcntl)
+        monkeypatch.setattr(sys, "platform", "darwin")
+        
+        source = temp_dir / "source.png"
+        source.write_bytes(b"png data" * 1000)
+        dest = temp_dir / "dest.png"
+        
+        assert _copy_file(source, dest) == 8000
+        assert dest.read_bytes() == source.read_bytes()
+        assert ioctl_calls == []
+    
+    def test_partial_kernel_copies_are_undone(self, temp_dir, monkeypatch):
+        """Test that methods failing midway leave nothing behind for the next one."""
+        import errno
+        import os
+        import file_organizer
+        
+        def copy_file_range_fails(src_fd, dst_fd, count):
+            os.write(dst_fd, b"partial")
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        
+        def sendfile_fails(out_fd, in_fd, offset, count):
+            os.read(in_fd, 3)
+            os.write(out_fd, b"partial")
+            raise OSError(errno.EINVAL, "Invalid argument")
+        
+        monkeypatch.setattr(file_organizer, "fcntl", None)
+        monkeypatch.setattr(os, "copy_file_range", copy_file_range_fails, raising=False)
+        monkeypatch.setattr(os, "sendfile", sendfile_fails, raising=False)
+        
+        source = temp_dir / "source.png"
+        source.write_bytes(b"png data" * 1000)
+        dest = temp_dir / "dest.png"
+        
+        assert _copy_file(source, dest) == 8000
+        assert dest.read_bytes() == source.read_bytes()
+
+
 class TestOrganizeImagesFunction:
     """Test the convenience function organize_images."""
     
@@ -440,4 +882,23 @@ class TestOrganizeImagesFunction:
         
         assert isinstance(report, OrganizationReport)
         assert report.total_input_images == 1
-        assert report.unique_images_copied == 1
\ No newline at end of file
+        assert report.unique_images_copied == 1
+    
+    def test_organize_images_function_copy_workers(self, temp_dir, output_dir):
+        """Test that the convenience function passes copy_workers through."""
+        all_images = []
+        for i in range(3):
+            path = temp_dir / f"image{i}.jpg"
+            path.write_bytes(bytes([i]) * 10)
+            all_images.append(path)
+        
+        report = organize_images(
+            duplicate_groups=[],
+            all_images=all_images,
+            output_directory=str(output_dir),
+            copy_workers=1
+        )
+        
+        assert report.unique_images_copied == 3
+        assert [r.source_path for r in report.copy_results] == all_images
+        assert sorted(p.name for p in output_dir.iterdir()) == ["image0.jpg", "image1.jpg", "image2.jpg"]
@@ -0,0 +1,72 @@
+"""
+Unit tests for hash_cache.py
+"""
+import os
+import pytest
+from hash_cache import HashCache
+from hash_generator import HashGenerator
+
+
+class TestHashCache:
+    """Test cases for HashCache class."""
+    
+    def test_roundtrip(self, sample_images_dir, temp_dir):
+        """Test that stored results are returned unchanged."""
+        image_paths = sorted(sample_images_dir.glob("*.png"))
+        results = HashGenerator().generate_hashes(image_paths, show_progress=False)
+        
+        with HashCache(temp_dir / "cache.db") as cache:
+            assert cache.get_many(image_paths, 8) == {}
+            assert cache.put_many(results, 8) == len(results)
+        
+        with HashCache(temp_dir / "cache.db") as cache:
+            cached = cache.get_many(image_paths, 8)
+        
+        assert [cached[p] for p in image_paths] == results
+    
+    def test_hash_size_is_part_of_key(self, sample_images_dir, temp_dir):
+        """Test that results for another hash size are not reused."""
+        image_paths = sorted(sample_images_dir.glob("*.png"))
+        
+        with HashCache(temp_dir / "cache.db") as cache:
+            cache.get_many(image_paths, 8)
+            cache.put_many(HashGenerator().generate_hashes(image_paths, show_progress=False), 8)
+            assert cache.get_many(image_paths, 16) == {}
+    
+    def test_modified_file_is_a_miss(self, sample_images_dir, temp_dir):
+        """Test that a changed mtime invalidates the cached entry."""
+        image_path = next(sample_images_dir.glob("*.png"))
+        
+        with HashCache(temp_dir / "cache.db") as cache:
+            cache.get_many([image_path], 8)
+            cache.put_many([HashGenerator().generate_hash(image_path)], 8)
+            
+            stat = image_path.stat()
+            os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            
+            assert cache.get_many([image_path], 8) == {}
+    
+    def test_errors_are_not_cached(self, corrupted_image_dir, temp_dir):
+        """Test that failed hash results are skipped."""
+        image_paths = sorted(corrupted_image_dir.iterdir())
+        results = HashGenerator().generate_hashes(image_paths, show_progress=False)
+        
+        with HashCache(temp_dir / "cache.db") as cache:
+            cache.get_many(image_paths, 8)
+            assert cache.put_many(results, 8) == sum(1 for r in results if not r.error)
+            
+            cached = cache.get_many(image_paths, 8)
+            assert set(cached) == {r.file_path for r in results if not r.error}
+    
+    def test_version_change_clears_cache(self, sample_images_dir, temp_dir, monkeypatch):
+        """Test that bumping the hash version discards old entries."""
+        image_paths = sorted(sample_images_dir.glob("*.png"))
+        
+        with HashCache(temp_dir / "cache.db") as cache:
+            cache.get_many(image_paths, 8)
+            cache.put_many(HashGenerator().generate_hashes(image_paths, show_progress=False), 8)
+        
+        monkeypatch.setattr(HashGenerator, "HASH_VERSION", HashGenerator.HASH_VERSION + 1)
+        
+        with HashCache(temp_dir / "cache.db") as cache:
+            assert cache.get_many(image_paths, 8) == {}
@@ -1,10 +1,14 @@
 """
 Unit tests for hash_generator.py
 """
+import itertools
+import os
 import pytest
 from pathlib import Path
 import numpy as np
-from hash_generator import HashGenerator, ImageHashResult, generate_image_hashes
+from hash_generator import (
+    HashGenerator, ImageHashResult, ImageHashTable, generate_image_hashes, generate_image_hashes_packed
+)
 
 
 class TestHashGenerator:
@@ -37,10 +41,10 @@ class TestHashGenerator:
         assert len(result.dhash) == expected_length, f"dHash should be {expected_length} chars, got {len(result.dhash)}"
         assert len(result.phash) == expected_length, f"pHash should be {expected_length} chars, got {len(result.phash)}"
         
-        # Validate hashes are proper hexadecimal
-        assert all(c in '0123456789abcdef' for c in result.ahash.lower()), "aHash should be hexadecimal"
-        assert all(c in '0123456789abcdef' for c in result.dhash.lower()), "dHash should be hexadecimal"
-        assert all(c in '0123456789abcdef' for c in result.phash.lower()), "pHash should be hexadecimal"
+        # Validate hashes are proper hexadecimal; the round trip rejects
+        # anything int() would tolerate, like a 0x prefix or underscores
+        for name, value in (('aHash', result.ahash), ('dHash', result.dhash), ('pHash', result.phash)):
+            assert f"{int(value, 16):0{expected_length}x}" == value.lower(), f"{name} should be hexadecimal"
         
         # Validate metadata
         assert result.file_size > 0
@@ -65,7 +69,7 @@ class TestHashGenerator:
     def test_generate_hashes_multiple_images(self, sample_images_dir):
         """Test generating hashes for multiple images."""
         generator = HashGenerator()
-        image_paths = list(sample_images_dir.rglob("*.jpg"))[:3]  # First 3 JPG images
+        image_paths = list(itertools.islice(sample_images_dir.rglob("*.jpg"), 3))  # First 3 JPG images
         
         results = generator.generate_hashes(image_paths, show_progress=False)
         
@@ -80,6 +84,73 @@ class TestHashGenerator:
             assert len(result.dhash) > 0
             assert len(result.phash) > 0
     
+    def test_iter_generate_hashes(self, sample_images_dir):
+        """Test that lazy hashing matches generate_hashes."""
+        generator = HashGenerator()
+        image_paths = sorted(sample_images_dir.rglob("*.png"))
+        
+        lazy = generator.iter_generate_hashes(iter(image_paths))
+        
+        assert list(lazy) == generator.generate_hashes(image_paths, show_progress=False)
+    
+    def test_generate_hashes_parallel_matches_serial(self, sample_images_dir):
+        """Test that the worker pool returns the serial results in order."""
+        generator = HashGenerator()
+        image_paths = sorted(sample_images_dir.rglob("*.*"))
+        image_paths = (image_paths * HashGenerator.PARALLEL_MIN_IMAGES)[:HashGenerator.PARALLEL_MIN_IMAGES]
+        
+        parallel = generator.generate_hashes(image_paths, show_progress=False, workers=2)
+        serial = generator.generate_hashes(image_paths, show_progress=False, workers=1)
+        
+        assert parallel == serial
+    
+    def test_generate_hashes_from_iterator(self, sample_images_dir):
+        """Test that a lazy iterable of paths is hashed on the pool in order."""
+        generator = HashGenerator()
+        image_paths = sorted(sample_images_dir.rglob("*.*"))
+        
+        streamed = generator.generate_hashes(iter(image_paths), show_progress=False, workers=2)
+        serial = generator.generate_hashes(image_paths, show_progress=False, workers=1)
+        
+        assert streamed == serial
+    
+    def test_generate_hashes_parallel_keeps_input_paths(self, sample_images_dir):
+        """Test that pool results refer to the caller's Path objects, not copies."""
+        generator = HashGenerator()
+        image_paths = sorted(sample_images_dir.rglob("*.*"))
+        
+        results = generator.generate_hashes(iter(image_paths), show_progress=False, workers=2)
+        
+        assert all(r.file_path is p for r, p in zip(results, image_paths))
+    
+    def test_generate_hashes_threaded_matches_serial(self, sample_images_dir):
+        """Test that the thread pool returns the serial results in order."""
+        generator = HashGenerator()
+        image_paths = sorted(sample_images_dir.rglob("*.*"))
+        image_paths = (image_paths * HashGenerator.PARALLEL_MIN_IMAGES)[:HashGenerator.PARALLEL_MIN_IMAGES]
+        
+        threaded = generator.generate_hashes(image_paths, show_progress=False, workers=2,
+                                             use_threads=True)
+        serial = generator.generate_hashes(image_paths, show_progress=False, workers=1)
+        
+        assert threaded == serial
+    
+    def test_generate_hash_table(self, sample_images_dir, corrupted_image_dir):
+        """Test that the hash table holds the same rows as generate_hashes."""
+        generator = HashGenerator()
+        image_paths = sorted(sample_images_dir.rglob("*.png")) + sorted(corrupted_image_dir.iterdir())
+        
+        table = generator.generate_hash_table(image_paths, show_progress=False, workers=1)
+        results = generator.generate_hashes(image_paths, show_progress=False, workers=1)
+        
+        assert isinstance(table, ImageHashTable)
+        assert len(table) == len(results)
+        assert list(table) == results
+        assert any(table.errors)
+        
+        # take() keeps the requested rows in the requested order
+        assert list(table.take([2, 0])) == [results[2], results[0]]
+    
     def test_hash_hamming_distance(self):
         """Test Hamming distance calculation between hashes."""
         generator = HashGenerator()
@@ -95,6 +166,54 @@ class TestHashGenerator:
         distance = generator.hash_hamming_distance(hash3, hash4)
         assert distance == 16  # 4 hex digits * 4 bits each = 16 bits all different
     
+    @pytest.mark.parametrize("bits", [64, 256])
+    def test_pack_hashes_hamming_distances(self, bits):
+        """Test packed distances against per-pair hash_hamming_distance."""
+        import random
+        from hash_generator import hamming_distances
+        rng = random.Random(bits)
+        generator = HashGenerator()
+        
+        results = [ImageHashResult(
+            file_path=Path(f"img{n}.png"), ahash=f"{rng.getrandbits(bits):0{bits // 4}x}",
+            dhash="", phash="", file_size=0, image_width=0, image_height=0, format="PNG"
+        ) for n in range(20)]
+        
+        words, lengths = generator.pack_hashes(results, ['ahash'])['ahash']
+        assert lengths is None
+        
+        distances = hamming_distances(words[:-1], words[1:])
+        expected = [generator.hash_hamming_distance(a.ahash, b.ahash)
+                    for a, b in zip(results[:-1], results[1:])]
+        assert distances.tolist() == expected
+    
+    def test_hash_values_cached(self):
+        """Test that hash values are parsed once and ignored by equality."""
+        result = ImageHashResult(
+            file_path=Path("img.png"), ahash="00ff", dhash="", phash="xyz1",
+            file_size=0, image_width=0, image_height=0, format="PNG"
+        )
+        copy = ImageHashResult(**{k: getattr(result, k) for k in
+                                  ("file_path", "ahash", "dhash", "phash", "file_size",
+                                   "image_width", "image_height", "format")})
+        
+        assert result.hash_values() == ((4, 255), None, None)
+        assert result.hash_values() is result.hash_values()
+        assert result == copy
+    
+    def test_are_results_similar_matches_are_similar(self):
+        """Test that cached comparisons agree with the string comparison."""
+        generator = HashGenerator()
+        base = dict(file_path=Path("img.png"), file_size=0, image_width=0,
+                    image_height=0, format="PNG")
+        result1 = ImageHashResult(ahash="ffff0000ffff0000", dhash="", phash="ghij", **base)
+        result2 = ImageHashResult(ahash="ffff0000ffff00ff", dhash="abcd", phash="ghik", **base)
+        
+        for algorithm in ("ahash", "dhash", "phash"):
+            for threshold in (0, 1, 8):
+                assert generator.are_results_similar(result1, result2, algorithm, threshold) == \
+                    generator.are_similar(getattr(result1, algorithm), getattr(result2, algorithm), threshold)
+    
     def test_hash_hamming_distance_different_lengths(self):
         """Test Hamming distance with different length hashes."""
         generator = HashGenerator()
@@ -134,10 +253,11 @@ class TestHashGenerator:
         generator = HashGenerator()
         
         # Get two different images
-        image_paths = list(sample_images_dir.glob("*.jpg"))
-        if len(image_paths) >= 2:
-            result1 = generator.generate_hash(image_paths[0])
-            result2 = generator.generate_hash(image_paths[1])
+        image_paths = sample_images_dir.glob("*.jpg")
+        path1, path2 = next(image_paths, None), next(image_paths, None)
+        if path1 and path2:
+            result1 = generator.generate_hash(path1)
+            result2 = generator.generate_hash(path2)
             
             # Test consensus with different agreement requirements
             similarity1 = generator.get_consensus_similarity(result1, result2, threshold=10, require_agreement=1)
@@ -206,6 +326,44 @@ class TestHashGenerator:
         assert result1.image_height == result2.image_height
 
 
+    def test_generate_hash_reuses_result_until_file_changes(self, temp_dir):
+        """Test that an unchanged file is not decoded again."""
+        generator = HashGenerator()
+        
+        from PIL import Image
+        image_path = temp_dir / "memo.png"
+        Image.new('RGB', (40, 40), color='red').save(image_path, "PNG")
+        
+        first = generator.generate_hash(image_path)
+        assert generator.generate_hash(image_path) is first
+        
+        # New content with a different size and mtime is hashed afresh
+        Image.new('RGB', (60, 30), color='blue').save(image_path, "PNG")
+        stat = image_path.stat()
+        os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = generator.generate_hash(image_path)
+        assert second is not first
+        assert (second.image_width, second.image_height) == (60, 30)
+    
+    def test_generate_hash_memo_is_bounded(self, temp_dir, monkeypatch):
+        """Test that the least recently used result is evicted first."""
+        monkeypatch.setattr(HashGenerator, 'MEMO_SIZE', 2)
+        generator = HashGenerator()
+        
+        from PIL import Image
+        paths = []
+        for i in range(3):
+            path = temp_dir / f"memo_{i}.png"
+            Image.new('RGB', (20, 20), color=(i * 80, 0, 0)).save(path, "PNG")
+            paths.append(path)
+        
+        results = [generator.generate_hash(path) for path in paths[:2]]
+        generator.generate_hash(paths[0])  # Now the most recently used
+        generator.generate_hash(paths[2])
+        
+        assert generator.generate_hash(paths[0]) is results[0]
+        assert generator.generate_hash(paths[1]) is not results[1]
+    
     def test_generate_hash_non_rgb_modes(self, temp_dir):
         """Test hash generation with non-RGB image modes."""
         generator = HashGenerator()
@@ -246,6 +404,54 @@ class TestHashGenerator:
             assert len(result.dhash) > 0
             assert len(result.phash) > 0
     
+    def test_generate_hash_grayscale_matches_rgb(self, temp_dir):
+        """Test that a grayscale image hashes the same as its RGB copy."""
+        generator = HashGenerator()
+        
+        from PIL import Image
+        
+        rng = np.random.default_rng(7)
+        l_img = Image.fromarray(rng.integers(0, 256, (60, 80), dtype=np.uint8), 'L')
+        l_path = temp_dir / "gray.png"
+        rgb_path = temp_dir / "rgb.png"
+        l_img.save(l_path, "PNG")
+        l_img.convert('RGB').save(rgb_path, "PNG")
+        
+        l_result = generator.generate_hash(l_path)
+        rgb_result = generator.generate_hash(rgb_path)
+        
+        assert (l_result.ahash, l_result.dhash, l_result.phash) == \
+            (rgb_result.ahash, rgb_result.dhash, rgb_result.phash)
+    
+    @pytest.mark.parametrize("hash_size", [5, 6, 8, 16])
+    def test_hashes_match_imagehash(self, hash_size):
+        """Test that the shared-grayscale hashes equal imagehash's output."""
+        import imagehash
+        from PIL import Image
+        
+        rng = np.random.default_rng(hash_size)
+        generator = HashGenerator(hash_size=hash_size)
+        
+        for size in [(7, 5), (64, 64), (301, 157)]:
+            img = Image.fromarray(rng.integers(0, 256, size[::-1] + (3,), dtype=np.uint8))
+            expected = (str(imagehash.average_hash(img, hash_size=hash_size)),
+                        str(imagehash.dhash(img, hash_size=hash_size)),
+                        str(imagehash.phash(img, hash_size=hash_size)))
+            assert generator._hashes_from_gray(img.convert('L')) == expected
+    
+    def test_generate_hash_drafted_jpeg_keeps_metadata(self, temp_dir):
+        """Test that draft decoding doesn't change reported size or format."""
+        from PIL import Image
+        
+        image_path = temp_dir / "large.jpg"
+        Image.new('RGB', (1200, 900), color='blue').save(image_path, "JPEG")
+        
+        result = HashGenerator().generate_hash(image_path)
+        
+        assert not result.error
+        assert (result.image_width, result.image_height) == (1200, 900)
+        assert result.format == "JPEG"
+    
     def test_hash_hamming_distance_invalid_hex(self):
         """Test fallback Hamming distance calculation with invalid hex strings."""
         generator = HashGenerator()
@@ -265,6 +471,9 @@ class TestHashGenerator:
         distance2 = generator.hash_hamming_distance(hash3, hash4)
         assert isinstance(distance2, int)
         assert distance2 >= 0
+        
+        # Non-ASCII characters still count once each
+        assert generator.hash_hamming_distance("abcé", "abcè") == 1
     
     def test_perceptual_similarity_validation(self, temp_dir):
         """Test that perceptually similar images have similar hashes."""
@@ -272,12 +481,9 @@ class TestHashGenerator:
         
         # Create base image with checkerboard pattern
         from PIL import Image
-        base_img = Image.new('RGB', (100, 100), color='white')
-        base_array = np.array(base_img)
-        for i in range(0, 100, 10):
-            for j in range(0, 100, 10):
-                if (i // 10 + j // 10) % 2 == 0:
-                    base_array[i:i+10, j:j+10] = [255, 0, 0]  # Red squares
+        rows, cols = np.indices((100, 100))
+        base_array = np.full((100, 100, 3), 255, dtype=np.uint8)
+        base_array[(rows // 10 + cols // 10) % 2 == 0] = [255, 0, 0]  # Red squares
         base_img = Image.fromarray(base_array)
         
         base_path = temp_dir / "base.jpg"
@@ -291,12 +497,8 @@ class TestHashGenerator:
         similar_img.save(similar_path, "JPEG", quality=95)
         
         # Create very different image (different pattern)
-        different_img = Image.new('RGB', (100, 100), color='white')
-        different_array = np.array(different_img)
-        for i in range(100):  # Diagonal stripes
-            for j in range(100):
-                if (i + j) % 20 < 10:
-                    different_array[i, j] = [0, 0, 255]  # Blue diagonal stripes
+        different_array = np.full((100, 100, 3), 255, dtype=np.uint8)
+        different_array[(rows + cols) % 20 < 10] = [0, 0, 255]  # Blue diagonal stripes
         different_img = Image.fromarray(different_array)
         different_path = temp_dir / "different.jpg"
         different_img.save(different_path, "JPEG", quality=95)
@@ -326,7 +528,7 @@ class TestGenerateImageHashesFunction:
     
     def test_generate_image_hashes_default(self, sample_images_dir):
         """Test generate_image_hashes with default parameters."""
-        image_paths = list(sample_images_dir.glob("*.jpg"))[:2]
+        image_paths = list(itertools.islice(sample_images_dir.glob("*.jpg"), 2))
         
         results = generate_image_hashes(image_paths)
         
@@ -335,7 +537,7 @@ class TestGenerateImageHashesFunction:
     
     def test_generate_image_hashes_custom_size(self, sample_images_dir):
         """Test generate_image_hashes with custom hash size."""
-        image_paths = list(sample_images_dir.glob("*.jpg"))[:1]
+        image_paths = list(itertools.islice(sample_images_dir.glob("*.jpg"), 1))
         
         results = generate_image_hashes(image_paths, hash_size=16)
         
@@ -344,4 +546,34 @@ class TestGenerateImageHashesFunction:
         result = results[0]
         if not result.error:
             # 16x16 = 256 bits = 64 hex chars (vs 8x8 = 64 bits = 16 hex chars)
-            assert len(result.ahash) > 16
\ No newline at end of file
+            assert len(result.ahash) > 16
+    
+    def test_generate_image_hashes_threaded(self, sample_images_dir, monkeypatch):
+        """Test generate_image_hashes on a thread pool matches serial hashing."""
+        monkeypatch.setattr(HashGenerator, 'PARALLEL_MIN_IMAGES', 2)
+        image_paths = sorted(sample_images_dir.rglob("*.*"))
+        
+        threaded = generate_image_hashes(image_paths, workers=2, use_threads=True)
+        serial = generate_image_hashes(image_paths, workers=1)
+        
+        assert threaded == serial
+    
+    def test_generate_image_hashes_packed(self, sample_images_dir, corrupted_image_dir):
+        """Test generate_image_hashes_packed matches the hex hashes."""
+        image_paths = list(itertools.islice(sample_images_dir.glob("*.jpg"), 2))
+        image_paths.append(corrupted_image_dir / "corrupted.jpg")
+        
+        paths, words = generate_image_hashes_packed(image_paths)
+        results = generate_image_hashes(paths)
+        
+        assert paths == image_paths[:2]
+        assert words.shape == (2, 3) and words.dtype == np.uint64
+        for row, result in zip(words, results):
+            assert [int(word) for word in row] == [int(h, 16) for h in (result.ahash, result.dhash, result.phash)]
+    
+    def test_generate_image_hashes_packed_empty(self):
+        """Test generate_image_hashes_packed with nothing to hash."""
+        paths, words = generate_image_hashes_packed([], hash_size=16)
+        
+        assert paths == []
+        assert words.shape == (0, 3, 4)
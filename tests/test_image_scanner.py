@@ -59,6 +59,36 @@ class TestImageScanner:
         with pytest.raises(NotADirectoryError):
             scanner.scan_directory(str(first_image))
     
+    def test_iter_scan_directory_matches_scan(self, sample_images_dir):
+        """Test that lazy scanning yields the same images as scan_directory."""
+        scanner = ImageScanner()
+        lazy = scanner.iter_scan_directory(str(sample_images_dir))
+        
+        assert not isinstance(lazy, list)
+        assert list(lazy) == scanner.scan_directory(str(sample_images_dir), show_progress=False)
+    
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_scan_directory_matches_rglob_order(self, temp_dir, workers):
+        """Test that the scandir walk keeps rglob's order and skips symlinked dirs."""
+        import os
+        for name in ["b/z.jpg", "a.png", "b/c/y.gif", "b/x.txt", "d/w.JPG", "v.bmp"]:
+            path = temp_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x")
+        os.symlink(temp_dir / "b", temp_dir / "linked")
+        
+        scanner = ImageScanner()
+        expected = [p for p in temp_dir.rglob('*') if scanner._is_image_file(p)]
+        
+        assert scanner.scan_directory(str(temp_dir), show_progress=False, workers=workers) == expected
+        assert len(expected) == 5
+    
+    def test_iter_scan_directory_validates_eagerly(self):
+        """Test that a bad directory raises before iteration starts."""
+        scanner = ImageScanner()
+        with pytest.raises(FileNotFoundError):
+            scanner.iter_scan_directory("/nonexistent/directory")
+    
     def test_is_image_file(self, sample_images_dir):
         """Test _is_image_file method."""
         scanner = ImageScanner()
@@ -88,6 +118,14 @@ class TestImageScanner:
         assert '.xyz' not in scanner.supported_extensions
         assert len(scanner.supported_extensions) == initial_count
     
+    def test_add_extension_does_not_affect_other_scanners(self):
+        """Test that adding an extension leaves the defaults untouched."""
+        scanner = ImageScanner()
+        scanner.add_extension('.xyz')
+        
+        assert '.xyz' not in ImageScanner.SUPPORTED_EXTENSIONS
+        assert '.xyz' not in ImageScanner().supported_extensions
+    
     def test_get_supported_extensions(self):
         """Test getting supported extensions returns a copy."""
         scanner = ImageScanner()
@@ -23,26 +23,23 @@ class TestCompleteWorkflow:
         input_dir.mkdir()
         
         # Create 3 unique images with patterns to avoid identical hashes
-        import numpy as np
-        
         # Red image with pattern
         red_array = np.full((100, 100, 3), [255, 0, 0], dtype=np.uint8)
         red_array[40:60, 40:60] = [200, 0, 0]  # Pattern
         red_img = Image.fromarray(red_array)
-        red_img.save(input_dir / "red.jpg", "JPEG", quality=95)
+        red_img.save(input_dir / "red.jpg", "JPEG", quality=50)
         
         # Green image with different pattern
         green_array = np.full((100, 100, 3), [0, 255, 0], dtype=np.uint8)
         green_array[20:80, 20:80] = [0, 200, 0]  # Different pattern
         green_img = Image.fromarray(green_array)
-        green_img.save(input_dir / "green.jpg", "JPEG", quality=95)
+        green_img.save(input_dir / "green.jpg", "JPEG", quality=50)
         
         # Blue gradient
         blue_array = np.zeros((100, 100, 3), dtype=np.uint8)
-        for i in range(100):
-            blue_array[:, i, 2] = int((i / 100) * 255)  # Blue gradient
+        blue_array[:, :, 2] = (np.arange(100) / 100 * 255).astype(np.uint8)  # Blue gradient
         blue_img = Image.fromarray(blue_array)
-        blue_img.save(input_dir / "blue.jpg", "JPEG", quality=95)
+        blue_img.save(input_dir / "blue.jpg", "JPEG", quality=50)
         
         # Step 1: Scan for images
         image_paths = scan_for_images(str(input_dir))
@@ -82,23 +79,17 @@ class TestCompleteWorkflow:
         input_dir.mkdir()
         
         # Create properly distinct images using deterministic patterns
-        import numpy as np
-        
         # Create checkerboard pattern (will be detected as duplicates when saved in different formats)
         def create_checkerboard():
+            rows, cols = np.indices((100, 100))
             img_array = np.zeros((100, 100, 3), dtype=np.uint8)
-            for i in range(0, 100, 20):
-                for j in range(0, 100, 20):
-                    if (i // 20 + j // 20) % 2 == 0:
-                        img_array[i:i+20, j:j+20] = [255, 255, 255]
+            img_array[(rows // 20 + cols // 20) % 2 == 0] = [255, 255, 255]
             return Image.fromarray(img_array)
         
         # Create stripe pattern (completely different structure)
         def create_stripes():
             img_array = np.zeros((100, 100, 3), dtype=np.uint8)
-            for i in range(0, 100, 10):
-                if (i // 10) % 2 == 0:
-                    img_array[i:i+10, :] = [255, 255, 255]
+            img_array[(np.arange(100) // 10) % 2 == 0, :] = [255, 255, 255]
             return Image.fromarray(img_array)
         
         # Create 3 versions of checkerboard (should be detected as duplicates)
@@ -145,8 +136,7 @@ class TestCompleteWorkflow:
             assert report.unique_images_copied < report.total_input_images
         
         # Verify output files exist and are valid
-        output_files = list(output_dir.rglob("*"))
-        output_images = [f for f in output_files if f.suffix.lower() in ['.jpg', '.png']]
+        output_images = [f for f in output_dir.rglob("*") if f.suffix.lower() in ('.jpg', '.png')]
         assert len(output_images) == report.unique_images_copied
         assert all(f.stat().st_size > 0 for f in output_images)
     
@@ -161,22 +151,14 @@ class TestCompleteWorkflow:
         
         # Create images in both directories with unique patterns
         # Red image with vertical stripes
-        red_img = Image.new('RGB', (100, 100), color='white')
-        red_array = np.array(red_img)
-        for i in range(100):
-            for j in range(100):
-                if j % 8 < 4:  # Vertical stripe pattern
-                    red_array[i, j] = [255, 0, 0]  # Red
+        red_array = np.full((100, 100, 3), 255, dtype=np.uint8)
+        red_array[:, np.arange(100) % 8 < 4] = [255, 0, 0]  # Red vertical stripes
         red_img = Image.fromarray(red_array)
         red_img.save(input_dir / "red.jpg", "JPEG")
         
         # Green image with horizontal stripes
-        green_img = Image.new('RGB', (100, 100), color='white')
-        green_array = np.array(green_img)
-        for i in range(100):
-            for j in range(100):
-                if i % 8 < 4:  # Horizontal stripe pattern
-                    green_array[i, j] = [0, 255, 0]  # Green
+        green_array = np.full((100, 100, 3), 255, dtype=np.uint8)
+        green_array[np.arange(100) % 8 < 4, :] = [0, 255, 0]  # Green horizontal stripes
         green_img = Image.fromarray(green_array)
         green_img.save(subdir / "green.jpg", "JPEG")
         
@@ -204,13 +186,10 @@ class TestCompleteWorkflow:
         input_dir.mkdir()
         
         # Create identical image in different formats with pattern
-        img = Image.new('RGB', (100, 100), color='white')
-        img_array = np.array(img)
+        rows, cols = np.indices((100, 100))
+        img_array = np.full((100, 100, 3), 255, dtype=np.uint8)
         # Create a diamond pattern
-        for i in range(100):
-            for j in range(100):
-                if abs(i - 50) + abs(j - 50) < 30:
-                    img_array[i, j] = [128, 0, 128]  # Purple
+        img_array[np.abs(rows - 50) + np.abs(cols - 50) < 30] = [128, 0, 128]  # Purple
         img = Image.fromarray(img_array)
         
         img.save(input_dir / "image.jpg", "JPEG", quality=95)
@@ -243,14 +222,11 @@ class TestCompleteWorkflow:
         input_dir.mkdir()
         
         # Create valid image with pattern
-        valid_img = Image.new('RGB', (50, 50), color='white')
-        valid_array = np.array(valid_img)
+        valid_array = np.full((50, 50, 3), 255, dtype=np.uint8)
         # Create a circular pattern
         center = 25
-        for i in range(50):
-            for j in range(50):
-                if (i - center)**2 + (j - center)**2 < 15**2:
-                    valid_array[i, j] = [255, 255, 0]  # Yellow
+        rows, cols = np.indices((50, 50))
+        valid_array[(rows - center)**2 + (cols - center)**2 < 15**2] = [255, 255, 0]  # Yellow
         valid_img = Image.fromarray(valid_array)
         valid_img.save(input_dir / "valid.jpg", "JPEG")
         
@@ -290,47 +266,40 @@ class TestCompleteWorkflow:
         output_files = list(output_dir.glob("*.jpg"))
         assert len(output_files) == 1
     
-    @pytest.mark.slow
-    def test_end_to_end_large_collection(self, temp_dir, output_dir):
+    @pytest.mark.parametrize("patterns,colors", [
+        # Smoke run, kept when slow tests are deselected
+        (['stripes', 'checkerboard'], [(255, 0, 0), (0, 255, 0)]),
+        pytest.param(
+            ['stripes', 'checkerboard', 'diamonds', 'circles', 'gradient'],
+            [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)],
+            marks=pytest.mark.slow
+        ),
+    ])
+    def test_end_to_end_large_collection(self, temp_dir, output_dir, patterns, colors):
         """Test workflow with larger collection of images."""
         input_dir = temp_dir / "input"
         input_dir.mkdir()
         
-        # Create 20 images with unique patterns to ensure they have different hashes
-        patterns = ['stripes', 'checkerboard', 'diamonds', 'circles', 'gradient']
-        colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)]
-        
+        # Create 4 images per pattern with unique patterns to ensure they have different hashes
+        # pHash only sees a 32x32 downscale, so 40x40 keeps every pattern
+        size = 40
+        rows, cols = np.indices((size, size))
         for i, (pattern, color) in enumerate(zip(patterns, colors)):
             # Create base pattern image
-            img = Image.new('RGB', (100, 100), color='white')
-            img_array = np.array(img)
+            img_array = np.full((size, size, 3), 255, dtype=np.uint8)
             
             if pattern == 'stripes':
-                for j in range(100):
-                    for k in range(100):
-                        if k % 8 < 4:
-                            img_array[j, k] = color
+                img_array[cols % 4 < 2] = color
             elif pattern == 'checkerboard':
-                for j in range(100):
-                    for k in range(100):
-                        if (j // 10 + k // 10) % 2 == 0:
-                            img_array[j, k] = color
+                img_array[(rows // 4 + cols // 4) % 2 == 0] = color
             elif pattern == 'diamonds':
-                for j in range(100):
-                    for k in range(100):
-                        if abs(j - 50) + abs(k - 50) < 30:
-                            img_array[j, k] = color
+                img_array[np.abs(rows - 20) + np.abs(cols - 20) < 12] = color
             elif pattern == 'circles':
-                center = 50
-                for j in range(100):
-                    for k in range(100):
-                        if (j - center)**2 + (k - center)**2 < 25**2:
-                            img_array[j, k] = color
+                center = 20
+                img_array[(rows - center)**2 + (cols - center)**2 < 10**2] = color
             elif pattern == 'gradient':
-                for j in range(100):
-                    for k in range(100):
-                        intensity = int((j + k) / 200 * 255)
-                        img_array[j, k] = tuple(int(c * intensity / 255) for c in color)
+                intensity = ((rows + cols) / (2 * size) * 255).astype(int)
+                img_array[:] = (np.array(color) * intensity[:, :, None] / 255).astype(np.uint8)
             
             img = Image.fromarray(img_array)
             
@@ -346,16 +315,14 @@ class TestCompleteWorkflow:
             
             # Create truly unique variation (add noise to make it different)
             img_noise = img_array.copy()
-            for j in range(0, 100, 5):  # Add noise pattern
-                for k in range(0, 100, 5):
-                    if (j + k) % 10 == 0:
-                        img_noise[j:j+2, k:k+2] = [128, 128, 128]  # Gray noise
+            img_noise[(rows % 2 == 0) & (cols % 2 == 0) & ((rows + cols) % 4 == 0)] = [128, 128, 128]  # Gray noise
             img_bright = Image.fromarray(img_noise)
             img_bright.save(input_dir / f"{pattern}_bright.jpg", "JPEG", quality=95)
         
         # Run complete workflow
+        image_total = 4 * len(patterns)
         image_paths = scan_for_images(str(input_dir))
-        assert len(image_paths) == 20
+        assert len(image_paths) == image_total
         
         hash_results = generate_image_hashes(image_paths)
         valid_results = [r for r in hash_results if not r.error]
@@ -371,18 +338,17 @@ class TestCompleteWorkflow:
         )
         
         # Verify results
-        assert report.total_input_images == 20
-        # Should find some duplicates, so fewer than 20 unique images
-        assert report.unique_images_copied < 20
-        assert report.unique_images_copied >= 5  # At least one from each color family
+        assert report.total_input_images == image_total
+        # Should find some duplicates, so fewer unique images than inputs
+        assert report.unique_images_copied < image_total
+        assert report.unique_images_copied >= len(patterns)  # At least one from each color family
         
         # Verify space savings
         if report.duplicate_groups_found > 0:
             assert report.total_space_saved > 0
         
         # Verify all copied files are valid
-        output_files = list(output_dir.rglob("*"))
-        output_images = [f for f in output_files if f.suffix.lower() in ['.jpg', '.png']]
+        output_images = [f for f in output_dir.rglob("*") if f.suffix.lower() in ('.jpg', '.png')]
         assert len(output_images) == report.unique_images_copied
         assert all(f.stat().st_size > 0 for f in output_images)
 
@@ -398,22 +364,15 @@ class TestReportGeneration:
         
         # Create test images with patterns to ensure they're truly unique
         # Create red image with diagonal stripes
-        red_img = Image.new('RGB', (50, 50), color='white')
-        red_array = np.array(red_img)
-        for i in range(50):
-            for j in range(50):
-                if (i + j) % 4 == 0:  # Diagonal stripe pattern
-                    red_array[i, j] = [255, 0, 0]  # Red
+        rows, cols = np.indices((50, 50))
+        red_array = np.full((50, 50, 3), 255, dtype=np.uint8)
+        red_array[(rows + cols) % 4 == 0] = [255, 0, 0]  # Red diagonal stripes
         red_img = Image.fromarray(red_array)
         red_img.save(input_dir / "red.jpg", "JPEG")
         
         # Create blue image with checkerboard pattern
-        blue_img = Image.new('RGB', (50, 50), color='white')
-        blue_array = np.array(blue_img)
-        for i in range(50):
-            for j in range(50):
-                if (i // 5 + j // 5) % 2 == 0:  # Checkerboard pattern
-                    blue_array[i, j] = [0, 0, 255]  # Blue
+        blue_array = np.full((50, 50, 3), 255, dtype=np.uint8)
+        blue_array[(rows // 5 + cols // 5) % 2 == 0] = [0, 0, 255]  # Blue checkerboard
         blue_img = Image.fromarray(blue_array)
         blue_img.save(input_dir / "blue.jpg", "JPEG")
         
@@ -5,11 +5,24 @@ import pytest
 from pathlib import Path
 import numpy as np
 import math
+import dataclasses
 from PIL import Image
-from quality_assessor import QualityAssessor, QualityScore, assess_image_quality
+from quality_assessor import (
+    QualityAssessor, QualityScore, assess_image_quality, _laplacian_variance, _prepare_gray,
+    _edge_densities
+)
 from hash_generator import ImageHashResult, HashGenerator
 
 
+def assert_valid_quality(quality: QualityScore) -> None:
+    """Assert that every score of a QualityScore is in range."""
+    scores = np.array([quality.overall_score, quality.format_score, quality.resolution_score,
+                       quality.size_score, quality.sharpness_score])
+    assert np.all((scores >= 0) & (scores <= 100)), f"Scores out of 0-100 range: {scores}"
+    assert isinstance(quality.has_watermark, bool)
+    assert 0 <= quality.watermark_confidence <= 1
+
+
 class TestQualityAssessor:
     """Test cases for QualityAssessor class."""
     
@@ -26,18 +39,20 @@ class TestQualityAssessor:
         total_weight = sum(assessor.score_weights.values())
         assert abs(total_weight - 1.0) < 0.01  # Should sum to ~1.0
     
-    def test_assess_format_quality(self):
+    @pytest.mark.parametrize("format_name,expected", [
+        ('PSD', 100),
+        ('PNG', 90),
+        ('JPG', 60),
+        ('UNKNOWN', 30),  # Default
+        # Case insensitivity
+        ('png', 90),
+        ('Jpg', 60),
+    ])
+    def test_assess_format_quality(self, format_name, expected):
         """Test format quality assessment."""
         assessor = QualityAssessor()
         
-        assert assessor._assess_format_quality('PSD') == 100
-        assert assessor._assess_format_quality('PNG') == 90
-        assert assessor._assess_format_quality('JPG') == 60
-        assert assessor._assess_format_quality('UNKNOWN') == 30  # Default
-        
-        # Test case insensitivity
-        assert assessor._assess_format_quality('png') == 90
-        assert assessor._assess_format_quality('Jpg') == 60
+        assert assessor._assess_format_quality(format_name) == expected
     
     def test_assess_resolution_quality(self):
         """Test resolution quality assessment."""
@@ -49,7 +64,6 @@ class TestQualityAssessor:
         score_large = assessor._assess_resolution_quality(4000, 4000)  # 16MP
         
         # Verify logarithmic scaling formula: (log10(pixels) / 8.0) * 100
-        import math
         expected_small = (math.log10(10000) / 8.0) * 100  # ~50 points
         expected_medium = (math.log10(1000000) / 8.0) * 100  # ~75 points
         expected_large = (math.log10(16000000) / 8.0) * 100  # ~90 points
@@ -90,11 +104,9 @@ class TestQualityAssessor:
         assessor = QualityAssessor()
         
         # Create a sharp image (checkerboard pattern)
+        rows, cols = np.indices((100, 100))
         sharp_array = np.zeros((100, 100, 3), dtype=np.uint8)
-        for i in range(0, 100, 10):
-            for j in range(0, 100, 10):
-                if (i // 10 + j // 10) % 2 == 0:
-                    sharp_array[i:i+10, j:j+10] = [255, 255, 255]
+        sharp_array[(rows // 10 + cols // 10) % 2 == 0] = [255, 255, 255]
         sharp_img = Image.fromarray(sharp_array)
         
         # Create a blurry image (solid color)
@@ -107,6 +119,41 @@ class TestQualityAssessor:
         assert sharp_score > blur_score
         assert all(0 <= score <= 100 for score in [sharp_score, blur_score])
     
+    def test_laplacian_variance(self):
+        """Test the Laplacian variance of a single bright pixel."""
+        gray = np.zeros((10, 10), dtype=np.uint8)
+        gray[5, 5] = 200
+        
+        # -4v at the pixel, +v at its four neighbours, 0 elsewhere
+        assert _laplacian_variance(gray) == pytest.approx(20 * 200 ** 2 / 100)
+    
+    def test_laplacian_variance_strided_view(self):
+        """Test that a non-contiguous view scores like its contiguous copy."""
+        rng = np.random.default_rng(0)
+        gray = rng.integers(0, 256, (40, 60), dtype=np.uint8)[:, ::2]
+        
+        assert _laplacian_variance(gray) == _laplacian_variance(gray.copy())
+    
+    def test_edge_densities_do_not_wrap(self):
+        """Test that dark-to-bright steps count their full contrast."""
+        regions = np.zeros((2, 4, 5), dtype=np.uint8)
+        regions[0, :, 1::2] = 255  # Alternating columns: every horizontal step is 255
+        
+        # Horizontal mean is 255 and vertical mean 0; the flat region scores 0
+        assert _edge_densities(regions) == pytest.approx([127.5, 0.0])
+    
+    def test_analyses_accept_prepared_gray(self):
+        """Test that sharpness and watermark checks take a shared gray array."""
+        assessor = QualityAssessor()
+        rng = np.random.default_rng(0)
+        img = Image.fromarray(rng.integers(0, 256, (1200, 800, 3), dtype=np.uint8))
+        
+        gray = _prepare_gray(img)
+        
+        assert max(gray.shape) == 1000
+        assert assessor._assess_sharpness(gray) == assessor._assess_sharpness(img)
+        assert assessor._detect_watermark(gray) == assessor._detect_watermark(img)
+    
     def test_detect_watermark_basic(self, temp_dir):
         """Test basic watermark detection."""
         assessor = QualityAssessor()
@@ -115,9 +162,8 @@ class TestQualityAssessor:
         clean_img = Image.new('RGB', (200, 200), color='blue')
         
         # Create image with text in corner (simulated watermark)
-        watermark_img = Image.new('RGB', (200, 200), color='blue')
+        watermark_array = np.full((200, 200, 3), [0, 0, 255], dtype=np.uint8)
         # Add some high-contrast patterns in corner
-        watermark_array = np.array(watermark_img)
         watermark_array[10:30, 10:30] = [255, 255, 255]  # White square in corner
         watermark_array[15:25, 15:25] = [0, 0, 0]        # Black square inside
         watermark_img = Image.fromarray(watermark_array)
@@ -134,26 +180,18 @@ class TestQualityAssessor:
         # Watermarked image should have higher confidence (due to high contrast pattern in corner)
         assert conf_marked >= conf_clean, f"Watermarked image should have higher confidence: {conf_marked} >= {conf_clean}"
     
-    def test_assess_image_quality_valid_image(self, sample_images_dir):
+    def test_assess_image_quality_valid_image(self, sample_jpg_hash):
         """Test quality assessment for valid images."""
         assessor = QualityAssessor()
-        generator = HashGenerator()
         
-        # Get a valid image and generate hash result
-        image_path = next(sample_images_dir.glob("*.jpg"))
-        hash_result = generator.generate_hash(image_path)
+        # A valid image and its hash result
+        image_path, hash_result = sample_jpg_hash
         
         quality = assessor.assess_image_quality(hash_result)
         
         assert isinstance(quality, QualityScore)
         assert quality.file_path == image_path
-        assert 0 <= quality.overall_score <= 100
-        assert 0 <= quality.format_score <= 100
-        assert 0 <= quality.resolution_score <= 100
-        assert 0 <= quality.size_score <= 100
-        assert 0 <= quality.sharpness_score <= 100
-        assert isinstance(quality.has_watermark, bool)
-        assert 0 <= quality.watermark_confidence <= 1
+        assert_valid_quality(quality)
     
     def test_assess_image_quality_with_error(self, corrupted_image_dir):
         """Test quality assessment for corrupted image."""
@@ -176,13 +214,101 @@ class TestQualityAssessor:
         assert quality.has_watermark is False
         assert quality.watermark_confidence == 0.0
     
-    def test_compare_images_single(self, sample_images_dir):
-        """Test comparing single image."""
+    def test_assess_batch_matches_single(self, sample_images_dir):
+        """Test that batch assessment gives the per-image scores."""
         assessor = QualityAssessor()
         generator = HashGenerator()
+        hash_results = generator.generate_hashes(sorted(sample_images_dir.rglob("*.*")),
+                                                 show_progress=False, workers=1)
+        hash_results.append(ImageHashResult(Path("missing.jpg"), "", "", "", 0, 0, 0, "",
+                                            error="File not found"))
+        hash_results.append(ImageHashResult(Path("odd.xyz"), "", "", "", 1, 0, 5, "XYZ"))
+        
+        batch = assessor.assess_batch(hash_results)
+        
+        assert len(batch) == len(hash_results)
+        for score, result in zip(batch, hash_results):
+            expected = assessor.assess_image_quality(result)
+            assert score.file_path == expected.file_path
+            assert score.has_watermark == expected.has_watermark
+            for field in ('overall_score', 'format_score', 'resolution_score', 'size_score',
+                          'sharpness_score', 'watermark_confidence'):
+                assert getattr(score, field) == pytest.approx(getattr(expected, field))
+    
+    def test_close_shuts_down_batch_pool(self, sample_images_dir):
+        """Test that close stops the assess_batch threads and the assessor stays usable."""
+        generator = HashGenerator()
+        hash_results = generator.generate_hashes(sorted(sample_images_dir.rglob("*.*")),
+                                                 show_progress=False, workers=1)
+        
+        with QualityAssessor() as assessor:
+            first = assessor.assess_batch(hash_results)
+            executor = assessor._executor
+            assert executor is not None
+        
+        assert assessor._executor is None
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
         
-        image_path = next(sample_images_dir.glob("*.jpg"))
-        hash_result = generator.generate_hash(image_path)
+        assert assessor.assess_batch(hash_results) == first
+        assessor.close()
+        assert assessor._executor is None
+    
+    def test_assess_uses_hash_stage_thumbnail(self, temp_dir, monkeypatch):
+        """Test that a kept grayscale thumbnail replaces decoding the file."""
+        image_path = temp_dir / "patterned.png"
+        rng = np.random.default_rng(0)
+        Image.fromarray(rng.integers(0, 256, (120, 90, 3), dtype=np.uint8)).save(image_path)
+        
+        plain = HashGenerator().generate_hash(image_path)
+        with_thumbnail = HashGenerator(thumbnail_size=1000).generate_hash(image_path)
+        assert plain.gray_thumbnail is None
+        assert with_thumbnail.gray_thumbnail.shape == (120, 90)
+        assert with_thumbnail == plain
+        
+        expected = QualityAssessor().assess_image_quality(plain)
+        assessor = QualityAssessor()
+        monkeypatch.setattr(assessor, '_load_gray', lambda f: pytest.fail("image was decoded"))
+        
+        assert assessor.assess_image_quality(with_thumbnail) == expected
+    
+    def test_pixel_analysis_cached_until_file_changes(self, temp_dir, monkeypatch):
+        """Test that unchanged files are not decoded again."""
+        assessor = QualityAssessor()
+        image_path = temp_dir / "cached.png"
+        Image.new('RGB', (50, 50), color='red').save(image_path)
+        
+        decoded = []
+        load_gray = assessor._load_gray
+        monkeypatch.setattr(assessor, '_load_gray', lambda f: decoded.append(f) or load_gray(f))
+        
+        first = assessor._assess_pixels(image_path)
+        assert assessor._assess_pixels(image_path) == first
+        assert len(decoded) == 1
+        
+        Image.new('RGB', (60, 50), color='blue').save(image_path)
+        assessor._assess_pixels(image_path)
+        assert len(decoded) == 2
+    
+    def test_compare_images_skips_dominated_candidates(self, monkeypatch):
+        """Test that images that can't win aren't decoded for analysis."""
+        assessor = QualityAssessor()
+        small_gif = ImageHashResult(Path("small.gif"), "", "", "", 2000, 64, 64, "GIF")
+        large_psd = ImageHashResult(Path("large.psd"), "", "", "", 50_000_000, 6000, 4000, "PSD")
+        
+        analyzed = []
+        assess_pixels = assessor._assess_result_pixels
+        monkeypatch.setattr(assessor, '_assess_result_pixels',
+                            lambda r: analyzed.append(r.file_path) or assess_pixels(r))
+        
+        assert assessor.compare_images([small_gif, large_psd]) is large_psd
+        assert analyzed == [Path("large.psd")]
+    
+    def test_compare_images_single(self, sample_jpg_hash):
+        """Test comparing single image."""
+        assessor = QualityAssessor()
+        
+        _, hash_result = sample_jpg_hash
         
         best = assessor.compare_images([hash_result])
         assert best == hash_result
@@ -193,8 +319,6 @@ class TestQualityAssessor:
         generator = HashGenerator()
         
         # Create two images - one PNG (higher format score), one larger JPG
-        from PIL import Image
-        
         # Small PNG
         small_png = Image.new('RGB', (100, 100), color='red')
         png_path = temp_dir / "small.png"
@@ -220,7 +344,6 @@ class TestQualityAssessor:
         assessor = QualityAssessor()
         generator = HashGenerator()
         
-        from PIL import Image
         img = Image.new('RGB', (100, 100), color='red')
         
         # Create same image in different formats
@@ -243,12 +366,10 @@ class TestQualityAssessor:
         """Test that overall score combines components correctly using known inputs."""
         assessor = QualityAssessor()
         
-        from PIL import Image
         img = Image.new('RGB', (100, 100), color='red')
         test_path = temp_dir / "test.jpg"
         img.save(test_path, "JPEG", quality=95)
         
-        from hash_generator import ImageHashResult
         hash_result = ImageHashResult(
             file_path=test_path,
             ahash="abcd1234", dhash="efgh5678", phash="ijkl9012",
@@ -301,6 +422,17 @@ class TestQualityScore:
         assert score.format_score == 90.0
         assert score.has_watermark is False
         assert score.watermark_confidence == 0.1
+    
+    def test_quality_score_is_immutable(self, temp_dir):
+        """Test that QualityScore fields can't be reassigned."""
+        score = QualityScore(
+            file_path=temp_dir / "test.jpg", overall_score=85.5, format_score=90.0,
+            resolution_score=80.0, size_score=85.0, sharpness_score=88.0,
+            has_watermark=False, watermark_confidence=0.1
+        )
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            score.overall_score = 0.0
 
 
     def test_assess_sharpness_large_image(self, temp_dir):
@@ -308,16 +440,11 @@ class TestQualityScore:
         assessor = QualityAssessor()
         
         # Create large image (>1000px) to trigger resize code path
-        from PIL import Image
-        import numpy as np
-        
         # Create 1500x1500 image with pattern
         large_array = np.zeros((1500, 1500, 3), dtype=np.uint8)
         # Add checkerboard pattern to create edges for sharpness detection
-        for i in range(0, 1500, 100):
-            for j in range(0, 1500, 100):
-                if (i // 100 + j // 100) % 2 == 0:
-                    large_array[i:i+100, j:j+100] = [255, 255, 255]
+        blocks = np.arange(1500) // 100
+        large_array[(blocks[:, None] + blocks) % 2 == 0] = [255, 255, 255]
         
         large_img = Image.fromarray(large_array)
         
@@ -333,7 +460,6 @@ class TestQualityScore:
         generator = HashGenerator()
         
         # Create RGBA image
-        from PIL import Image
         rgba_img = Image.new('RGBA', (100, 100), color=(255, 0, 0, 128))  # Semi-transparent red
         rgba_path = temp_dir / "test_rgba.png"
         rgba_img.save(rgba_path, "PNG")
@@ -352,14 +478,12 @@ class TestQualityScore:
 class TestAssessImageQualityFunction:
     """Test the convenience function assess_image_quality."""
     
-    def test_assess_image_quality_function(self, sample_images_dir):
+    def test_assess_image_quality_function(self, sample_jpg_hash):
         """Test assess_image_quality convenience function."""
-        generator = HashGenerator()
-        image_path = next(sample_images_dir.glob("*.jpg"))
-        hash_result = generator.generate_hash(image_path)
+        image_path, hash_result = sample_jpg_hash
         
         quality = assess_image_quality(hash_result)
         
         assert isinstance(quality, QualityScore)
         assert quality.file_path == image_path
-        assert 0 <= quality.overall_score <= 100
\ No newline at end of file
+        assert_valid_quality(quality)
\ No newline at end of file